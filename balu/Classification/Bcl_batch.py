@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from itertools import islice
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from .Bcl_structure import _classifier
+
+
+def Bcl_batch(Xt, b, chunk=65536, n_jobs=1, out=None):
+    """ ds = Bcl_batch(Xt, b, chunk, n_jobs, out)
+
+     Toolbox: Balu
+        Testing of a trained Balu classifier on test data that does not fit in
+        memory. The classifier is called on blocks of chunk rows of Xt and its
+        outputs are written in ds.
+
+        Xt is the test data: an array, a memory-mapped array (numpy.memmap or
+        numpy.load(..., mmap_mode='r')), any object with shape and row slicing,
+        or an iterator of blocks of rows (e.g. a generator that reads a file).
+        b is the trained classifier as in Bcl_structure, i.e.
+           b['name']    = Balu classifier's name (e.g. 'lda', 'knn' or
+                          'structure' for a list of classifiers)
+           b['options'] = options of the trained classifier.
+        chunk is the number of rows of each block (default 65536), it is not
+        used if Xt is an iterator.
+        n_jobs is the number of blocks tested at the same time in a thread pool
+        (default 1, -1 means all the cores). Useful for classifiers that spend
+        their time in NumPy / scikit-learn code that releases the GIL.
+        out is the array where the output is written (e.g. a numpy.memmap),
+        or the name of a .npy file to be created as a memory-mapped array.
+        If out is not given the output is returned in memory.
+
+        ds has one row per row of Xt, the columns are the output of the
+        classifier. With options['output'] = 2 or 3 the two outputs (class
+        and score) are the two columns of ds.
+
+     Example:
+        import numpy as np
+        from balu.ImagesAndData import balu_load
+        from balu.Classification import Bcl_lda, Bcl_batch
+
+        data = balu_load('datagauss')
+        op = Bcl_lda(data['X'], data['d'], {'p': []})
+        Xt = np.load('features.npy', mmap_mode='r')            # several GB
+        ds = Bcl_batch(Xt, {'name': 'lda', 'options': op}, 100000, -1, 'ds.npy')
+
+     See also Bcl_structure.
+    """
+
+    cl = _classifier(b['name'])
+    options = b['options']
+    pair = isinstance(options, dict) and 'output' in options and options['output'] in (2, 3)
+    if n_jobs < 0:
+        n_jobs = cpu_count()
+
+    def predict(x):
+        x = np.asarray(x)
+        ds = np.asarray(cl(x, options)[0])
+        if pair:
+            ds = ds.reshape(2, x.shape[0]).T
+        return ds
+
+    if hasattr(Xt, 'shape') and hasattr(Xt, '__getitem__'):
+        N = Xt.shape[0]
+        blocks = (Xt[q:q + chunk] for q in range(0, N, chunk))
+    else:
+        N = None
+        blocks = iter(Xt)
+
+    pool = ThreadPool(n_jobs) if n_jobs > 1 else None
+    res = []
+    q = 0
+    try:
+        while True:
+            wave = list(islice(blocks, max(n_jobs, 1)))
+            if len(wave) == 0:
+                break
+            if pool is None:
+                ds = [predict(x) for x in wave]
+            else:
+                ds = pool.map(predict, wave)
+
+            for dsi in ds:
+                if isinstance(out, str):
+                    if N is None:
+                        print('Bcl_batch: the output file requires test data with known size.')
+                        exit()
+                    out = np.lib.format.open_memmap(out, mode='w+', dtype=float, shape=(N,) + dsi.shape[1:])
+                if out is not None:
+                    out[q:q + dsi.shape[0]] = dsi
+                else:
+                    res.append(dsi)
+                q += dsi.shape[0]
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if out is not None:
+        if hasattr(out, 'flush'):
+            out.flush()
+        return out
+    if len(res) == 0:
+        return np.zeros(0)
+    return np.concatenate(res)
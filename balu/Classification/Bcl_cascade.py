@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from .Bcl_construct import Bcl_construct
+from .Bcl_structure import _classifier
+from .Bcl_dmin import _scores as _scores_dmin
+from .Bcl_maha import _scores as _scores_maha
+from .Bcl_lda import _scores as _scores_lda
+from .Bcl_qda import _scores as _scores_qda
+
+_scores = {'Bcl_dmin': _scores_dmin, 'Bcl_maha': _scores_maha, 'Bcl_lda': _scores_lda, 'Bcl_qda': _scores_qda}
+
+
+def Bcl_cascade(*args):
+    """ ds, options = Bcl_cascade(X, d, Xt, options)  Training & Testing together
+     options = Bcl_cascade(X, d, options)     Training only
+     ds, options = Bcl_cascade(Xt, options)   Testing only
+
+     Toolbox: Balu
+        Cascade of Balu classifiers for two classes (e.g. good and defective
+        parts). The samples are tested by the stages in order, each stage
+        decides the samples that are clearly of one class and only the
+        uncertain ones are tested by the next (more expensive) stage.
+
+        Design data:
+           X is a matrix with features (columns)
+           d is the ideal classification for X (two classes)
+           options['stages'] is a list of stages, each one with
+              'name'     : Balu classifier's name. The stages but the last one
+                           must be 'dmin', 'lda', 'maha' or 'qda' (their
+                           discriminant functions give the margin).
+              'options'  : options of the classifier.
+              'features' : indices of the columns of X used by the stage
+                           (default: all).
+           options['positive'] is the label of the positive class (e.g.
+           defective parts, default: max(d)).
+           options['fnr'] is the target false-negative rate of the early
+           exits (positives accepted as negatives by the stages but the last
+           one, default 0.01) and options['fpr'] the target false-positive
+           rate of the early exits (negatives rejected as positives by the
+           stages but the last one, default 0.05). Each early stage can use
+           1 / (number of stages - 1) of them. The errors of the last stage are
+           not included: the rates of the cascade are the ones of the early
+           exits plus the ones of the last stage on the samples that reach it.
+
+           Each stage is trained with the design samples that reach it. The
+           margin of a sample is the discriminant of the positive class minus
+           the discriminant of the negative class. The sample is accepted
+           (negative) if its margin is lower than options['accept'][i] and
+           rejected (positive) if it is greater than options['reject'][i],
+           the thresholds are the margins of the design samples that give
+           the target rates. The last stage decides all the remaining samples.
+           If no design sample or the samples of only one class reach a stage,
+           the cascade is truncated: the previous stage is the last one.
+
+        Test data:
+           Xt is a matrix with features (columns)
+
+        Output:
+           ds is the classification on test data
+           options['stages'] contains the trained stages.
+           options['truncated'] = True if the cascade was truncated in
+           training (options['stages'] has less stages than the design).
+           options['pass'][i] is the fraction of the samples that reach stage i
+           (options['pass'][0] = 1): of the design samples after training and
+           of the test samples after testing (the options of the test are a
+           copy of the trained ones with the test rates).
+           options['show'] = True prints options['pass'] of the test.
+           options['string'] is a 8 character string that describes the performed
+           classification (in this case 'cascade ').
+
+        Example:
+            from balu.ImagesAndData import balu_load
+            from balu.Classification import Bcl_cascade
+            from balu.PerformanceEvaluation import Bev_performance
+
+            data = balu_load('datagauss')           # simulated data (2 classes, 2 features)
+            s = [
+                {'name': 'dmin', 'options': {}, 'features': [0]},
+                {'name': 'lda',  'options': {'p': []}},
+                {'name': 'svm',  'options': {'kernel': 'rbf'}},
+            ]
+            op = {'stages': s, 'fnr': 0.01, 'fpr': 0.05, 'show': True}
+            ds, op = Bcl_cascade(data['X'], data['d'], data['Xt'], op)
+            p = Bev_performance(ds, data['dt'])     # performance on test data
+            print(op['pass'])
+
+        See also Bcl_structure, Bcl_ensemble.
+    """
+
+    train, test, X, d, Xt, options = Bcl_construct(args)
+
+    if train:
+        options = options.copy()
+        options['string'] = 'cascade '
+        d = np.asarray(d).ravel()
+        classes = np.unique(d)
+        if classes.size != 2:
+            print('Bcl_cascade: the cascade requires two classes.')
+            exit()
+        pos = options['positive'] if 'positive' in options else classes.max()
+        neg = classes[classes != pos][0]
+        options['positive'], options['negative'] = pos, neg
+
+        stages = options['stages']
+        S = len(stages)
+        fnr = options['fnr'] if 'fnr' in options else 0.01
+        fpr = options['fpr'] if 'fpr' in options else 0.05
+        a = int(np.floor(fnr / max(S - 1, 1) * np.sum(d == pos)))     # positives accepted by a stage
+        b = int(np.floor(fpr / max(S - 1, 1) * np.sum(d == neg)))     # negatives rejected by a stage
+
+        N = d.size
+        active = np.arange(N)
+        trained = []
+        accept = np.zeros(S - 1)
+        reject = np.zeros(S - 1)
+        rate = np.zeros(S)
+        truncated = False
+        for i in range(S):
+            s = stages[i].copy()
+            rate[i] = active.size / float(N)
+            if np.unique(d[active]).size < 2:
+                # the previous stage decides the remaining samples
+                print('Bcl_cascade: the design samples that reach stage {0} are of one class or none, '
+                      'stage {1} is the last one.'.format(i, i - 1))
+                truncated = True
+                break
+            x = _features(X[active], s)
+            s['options'] = _classifier(s['name'])(x, d[active][:, np.newaxis], s['options'])
+            trained.append(s)
+            if i == S - 1:
+                break
+
+            m = _margin(s, x, pos, neg)
+            mp = np.sort(m[d[active] == pos])
+            mn = np.sort(m[d[active] == neg])[::-1]
+            accept[i] = mp[a] if a < mp.size else np.inf
+            reject[i] = mn[b] if b < mn.size else -np.inf
+            active = active[(m >= accept[i]) & (m <= reject[i])]
+
+        S = len(trained)
+        options['stages'] = trained
+        options['accept'] = accept[0:S - 1]
+        options['reject'] = reject[0:S - 1]
+        options['pass'] = rate[0:S]
+        options['truncated'] = truncated
+        output = options
+
+    if test:
+        stages = options['stages']
+        S = len(stages)
+        pos, neg = options['positive'], options['negative']
+        Nt = Xt.shape[0]
+        ds = np.zeros((Nt, 1))
+        active = np.arange(Nt)
+        rate = np.zeros(S)
+        for i in range(S):
+            rate[i] = active.size / float(max(Nt, 1))
+            if active.size == 0:
+                continue
+            s = stages[i]
+            x = _features(Xt[active] if active.size < Nt else Xt, s)
+            if i == S - 1:
+                ds[active, 0] = np.asarray(_classifier(s['name'])(x, s['options'])[0]).ravel()[0:active.size]
+                break
+
+            m = _margin(s, x, pos, neg)
+            acc = m < options['accept'][i]
+            rej = ~acc & (m > options['reject'][i])
+            ds[active[acc], 0] = neg
+            ds[active[rej], 0] = pos
+            active = active[~(acc | rej)]
+
+        options = options.copy()                # the trained options are not modified
+        options['pass'] = rate
+        if 'show' in options and options['show']:
+            print('Bcl_cascade: fraction of the test samples per stage: ' + ', '.join(['{0:.3f}'.format(r) for r in rate]))
+        output = ds, options
+
+    return output
+
+
+def _features(X, s):
+    if 'features' in s:
+        return X[:, s['features']]
+    return X
+
+
+def _margin(s, x, pos, neg):
+    # discriminant of the positive class minus the one of the negative class
+    name = _classifier(s['name']).__name__
+    if name not in _scores:
+        print('Bcl_cascade: {0} can only be the last stage (dmin, lda, maha or qda before).'.format(name))
+        exit()
+    g = _scores[name](s['options'], x)
+    dmin = s['options']['dmin']
+    return g[:, int(pos - dmin)].astype(float) - g[:, int(neg - dmin)]
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 from .Bcl_construct import Bcl_construct
-from .Bcl_outscore import Bcl_outscore
+from .Bcl_outscore import Bcl_outscore, _param, _gap
+from .Bcl_dtype import _dtype
 
 
 def Bcl_dmin(*args):
@@ -25,6 +26,15 @@ def Bcl_dmin(*args):
            options[´dmin'] contains np.min(d).
            options['string'] is a 8 character string that describes the performed
            classification (in this case 'dmin    ').
+           options['chunk'] number of test samples processed at once (default
+           4096). The squared distances of a chunk to all centroids are computed
+           with one matrix product, ||x||^2 - 2*x*mc' + ||mc||^2.
+           options['dtype'] = 'float32' or 'float64' is the type of the
+           parameters and of the test computations (default: Bcl_dtype()).
+           options['output'] = 3 gives as score the sigmoid of the gap between
+           the two best discriminant functions, fitted in training to the
+           correct decisions on the design data (options['param'], see
+           Bft_sigmoid and Bcl_outscore).
 
         Example: Training & Test together:
             from balu.ImagesAndData import balu_load
@@ -73,11 +83,9 @@ def Bcl_dmin(*args):
     if options is None:
         options = {}
 
-    options = options.copy()
-
-    options['string'] = 'dmin    '
-
     if train:
+        options = options.copy()
+        options['string'] = 'dmin    '
         m = X.shape[1]
         dmin = d.min()
         dmax = d.max()
@@ -87,29 +95,70 @@ def Bcl_dmin(*args):
 
         for i in range(int(n)):
             ii, _ = np.where(d == i + 1)
-            mc[i, :] = np.mean(X[ii, :], axis=0)
+            mc[i, :] = np.mean(X[ii, :], axis=0, dtype=np.float64)
 
-        options['mc'] = mc
-        options['dmin'] = dmin
+        options = _fit(options, dmin, mc)
+        options = _param(options, _scores, X, d)
         output = options
 
     if test:
         mc = options['mc']
+        dt = mc.dtype
         n = mc.shape[0]
         Nt = Xt.shape[0]
         ds = np.zeros((Nt, 1))
         sc = np.zeros((Nt, 1))
-
-        for q in range(Nt):
-            D = np.dot(np.ones((n, 1)), Xt[q, :][np.newaxis]) - mc
-            e = np.sum(D * D, axis=1)
-            i = np.min(e)
-            j = np.argmin(e)
-            ds[q, 0] = j
-            sc[q, 0] = i
+        out3 = 'output' in options and options['output'] == 3
+        chunk = options['chunk'] if 'chunk' in options else 4096
+        c0 = np.mean(mc, axis=0, dtype=np.float64).astype(dt)
+        mcc = mc - c0                           # centered centroids
+        cc = np.sum(mcc * mcc, axis=1)
+        eps = np.finfo(dt).eps * 2 * (mc.shape[1] + 4)
+
+        for q in range(0, Nt, chunk):
+            x = np.asarray(Xt[q:q + chunk, :], dtype=dt)
+            xc = x - c0
+            xx = np.sum(xc * xc, axis=1)
+            e = xx[:, np.newaxis] - 2 * np.dot(xc, mcc.T) + cc
+            j = np.argmin(e, axis=1)
+
+            # the expansion has rounding errors (bounded by the norms of the
+            # centered vectors), the samples whose two nearest centroids are
+            # closer than the bound are decided with the exact distances
+            if n > 1:
+                e2 = np.partition(e, 1, axis=1)
+                tol = eps * (np.sqrt(xx) + np.sqrt(cc.max())) ** 2
+                k = np.where(e2[:, 1] - e2[:, 0] <= tol)[0]
+                if k.size > 0:
+                    xk = x[k, :].astype(float)
+                    E = np.zeros((k.size, n))
+                    for i in range(n):
+                        D = xk - mc[i, :]
+                        E[:, i] = np.sum(D * D, axis=1)
+                    j[k] = np.argmin(E, axis=1)
+
+            D = x - mc[j, :]
+            ds[q:q + chunk, 0] = j
+            sc[q:q + chunk, 0] = np.sum(D * D, axis=1) if not out3 else _gap(-e)
 
         ds = ds + options['dmin']
         ds = Bcl_outscore(ds, sc, options)
         output = ds, options
 
     return output
+
+
+def _scores(options, x):
+    # minus the squared Euclidean distances of the rows of x to the centroids
+    mc = options['mc']
+    c0 = np.mean(mc, axis=0, dtype=np.float64).astype(mc.dtype)
+    mc = mc - c0
+    x = np.asarray(x, dtype=mc.dtype) - c0
+    return -(np.sum(x * x, axis=1)[:, np.newaxis] - 2 * np.dot(x, mc.T) + np.sum(mc * mc, axis=1))
+
+
+def _fit(options, dmin, mc):
+    # options of a trained classifier from the centroids of the classes (see Bcl_finalize)
+    options['mc'] = mc.astype(_dtype(options))
+    options['dmin'] = dmin
+    return options
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+_policy = {'dtype': np.dtype(np.float64)}
+
+
+def Bcl_dtype(dtype=None):
+    """ dtype = Bcl_dtype(dtype)
+     dtype = Bcl_dtype()
+
+     Toolbox: Balu
+        Floating point type of the Balu classifiers Bcl_dmin, Bcl_maha,
+        Bcl_lda and Bcl_qda: 'float64' (default) or 'float32'.
+
+        With 'float32' the parameters of the trained classifiers (centroids,
+        whitening matrices, discriminant functions...) are stored in float32
+        and the test data is processed in float32: half the memory of the
+        test data and 1.1 to 1.5 times faster tests on large test sets (see
+        benchmarks/bench_float32.py, centered and uncentered data, the same
+        decisions as float64 in the benchmark). The means and the
+        covariances are always accumulated in float64 and the matrices are
+        inverted in float64, only the results are rounded to float32.
+
+        Bcl_dtype(dtype) sets the type for all the classifiers trained after
+        the call, options['dtype'] sets it for one classifier. Bcl_dtype()
+        returns the current type.
+
+     Example:
+        from balu.ImagesAndData import balu_load
+        from balu.Classification import Bcl_dtype, Bcl_lda
+
+        data = balu_load('datagauss')
+        Bcl_dtype('float32')
+        op = Bcl_lda(data['X'], data['d'], {'p': []})                       # float32
+        op = Bcl_lda(data['X'], data['d'], {'p': [], 'dtype': 'float64'})   # float64
+
+     See also Bcl_dmin, Bcl_maha, Bcl_lda, Bcl_qda.
+    """
+
+    if dtype is not None:
+        _policy['dtype'] = _check(dtype)
+    return _policy['dtype'].name
+
+
+def _dtype(options):
+    # floating point type of a classifier: options['dtype'] or the global one
+    if options is not None and 'dtype' in options:
+        return _check(options['dtype'])
+    return _policy['dtype']
+
+
+def _check(dtype):
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        print('Bcl_dtype: type {0} is not supported (float32 or float64).'.format(dtype))
+        exit()
+    return dtype
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from .Bcl_construct import Bcl_construct
+from .Bcl_outscore import Bcl_outscore
+from .Bcl_structure import Bcl_structure, _classifier
+
+
+def Bcl_ensemble(*args):
+    """ ds, options = Bcl_ensemble(X, d, Xt, options)  Training & Testing together
+     options = Bcl_ensemble(X, d, options)     Training only
+     ds, options = Bcl_ensemble(Xt, options)   Testing only
+
+     Toolbox: Balu
+        Ensemble of Balu classifiers. The members are trained with
+        Bcl_structure and their decisions are fused.
+
+        Design data:
+           X is a matrix with features (columns)
+           d is the ideal classification for X
+           options['members'] is a Balu classifier structure b (see
+           Bcl_structure) with the members of the ensemble.
+           options['weights'] are the weights of the members (default: 1 for
+           all of them).
+           options['fusion'] is the fusion method:
+              'vote'  : weighted majority vote (default). The support of a
+                        class is the sum of the weights of the members that
+                        choose it.
+              'score' : average of the posterior probabilities of the members.
+                        The posterior of a member that chooses class c is r
+                        for c and (1 - r) / (K - 1) for the other K - 1
+                        classes, where r is the reliability of the member for
+                        class c: the fraction of correct decisions when it
+                        chooses c. The reliabilities are estimated on a
+                        hold-out fraction options['val'] of the design data
+                        (default 0.25), then the members are trained again
+                        with all the data.
+           options['early_exit'] tests the members in their order and stops
+           the testing of a sample when the first members agree enough:
+              True  : when the remaining members can not change the decision
+                      (the result is the same as without early exit).
+              t < 1 : when the support of the winner class reaches the
+                      fraction t of the total weight (e.g. 0.6).
+           Put the fastest (or most accurate) members first.
+
+        Test data:
+           Xt is a matrix with features (columns)
+
+        Output:
+           ds is the classification on test data. The score (options['output'],
+           see Bcl_outscore) is the fraction of the weight of the tested
+           members that supports the winner class.
+           options['members'] contains the trained members.
+           options['classes'] are the classes of the design data.
+           options['reliability'][i, k] is the reliability of member i for
+           class options['classes'][k] ('score' fusion).
+           options['show'] = True prints the average number of members tested
+           per sample.
+           options['string'] is a 8 character string that describes the performed
+           classification (in this case 'ensemble').
+
+        Example:
+            from balu.ImagesAndData import balu_load
+            from balu.Classification import Bcl_ensemble
+            from balu.PerformanceEvaluation import Bev_performance
+
+            data = balu_load('datagauss')           # simulated data (2 classes, 2 features)
+            b = [
+                {'name': 'dmin', 'options': {}},
+                {'name': 'lda',  'options': {'p': []}},
+                {'name': 'knn',  'options': {'k': 5}},
+            ]
+            op = {'members': b, 'fusion': 'vote', 'early_exit': True}
+            ds, op = Bcl_ensemble(data['X'], data['d'], data['Xt'], op)
+            p = Bev_performance(ds, data['dt'])     # performance on test data
+
+        See also Bcl_structure.
+    """
+
+    train, test, X, d, Xt, options = Bcl_construct(args)
+
+    if train:
+        options = options.copy()
+        options['string'] = 'ensemble'
+        d = np.asarray(d).ravel()
+        b = options['members']
+        if not isinstance(b, list):
+            b = [b]
+        M = len(b)
+        options['weights'] = np.ones(M) if 'weights' not in options else np.asarray(options['weights'], dtype=float)
+        options['classes'] = np.unique(d)
+        K = options['classes'].size
+
+        fusion = options['fusion'] if 'fusion' in options else 'vote'
+        if fusion == 'score':
+            # reliabilities on a hold-out part of the design data
+            N = d.size
+            i = np.random.RandomState(0).permutation(N)
+            nv = int(round(N * (options['val'] if 'val' in options else 0.25)))
+            v, t = i[0:nv], i[nv:]
+            ds, _ = Bcl_structure(X[t], d[t], X[v], b)
+            if ds.ndim == 3:
+                ds = ds[:, :, 0]                # members with class and score
+            C = _code(ds, options['classes'])
+            r = np.zeros((M, K))
+            for j in range(M):
+                n = np.bincount(C[:, j], minlength=K)
+                ok = np.bincount(C[:, j], weights=C[:, j] == _code(d[v], options['classes'])[:, 0], minlength=K)
+                r[j] = (ok + 1) / (n + 2.0)
+            options['reliability'] = r
+        elif fusion != 'vote':
+            print('Bcl_ensemble: fusion {0} does not exist.'.format(fusion))
+            exit()
+
+        options['members'] = Bcl_structure(X, d, b)
+        output = options
+
+    if test:
+        b = options['members']
+        w = options['weights']
+        classes = options['classes']
+        K = classes.size
+        M = len(b)
+        Nt = Xt.shape[0]
+        exit_ = options['early_exit'] if 'early_exit' in options else False
+        r = options['reliability'] if 'reliability' in options else None
+
+        C = np.zeros((Nt, M), int)              # code of the class chosen by each member
+        B = np.zeros((Nt, M))                   # weight given to that class
+        S0 = np.zeros(Nt)                       # weight given to all the classes
+        active = np.arange(Nt)
+        tested = np.zeros(Nt, int)
+        for j in range(M):
+            if active.size == 0:
+                break
+            x = Xt[active] if active.size < Nt else Xt
+            dsj = np.asarray(_classifier(b[j]['name'])(x, b[j]['options'])[0]).ravel()[0:active.size]
+            c = _code(dsj, classes)[:, 0]
+            C[active, j] = c
+            if r is None:
+                B[active, j] = w[j]
+            else:
+                q = (1 - r[j, c]) / max(K - 1, 1)
+                B[active, j] = w[j] * (r[j, c] - q)
+                S0[active] += w[j] * q
+            tested[active] += 1
+
+            if exit_ is not False and j < M - 1:
+                S = _vote(C[active, 0:j + 1], B[active, 0:j + 1], K)
+                S2 = -np.partition(-S, 1, axis=1)[:, 0:2] if K > 1 else np.hstack((S, np.zeros_like(S)))
+                if exit_ is True:
+                    done = S2[:, 0] - S2[:, 1] > np.sum(w[j + 1:])
+                else:
+                    done = S2[:, 0] + S0[active] >= exit_ * np.sum(w)
+                active = active[~done]
+
+        S = _vote(C, B, K) + S0[:, np.newaxis]
+        j = np.argmax(S, axis=1)
+        sc = S[np.arange(Nt), j] / np.maximum(np.cumsum(w)[tested - 1], 1e-300)
+        ds = Bcl_outscore(classes[j][:, np.newaxis], sc[:, np.newaxis], options)
+        if 'show' in options and options['show']:
+            print('Bcl_ensemble: {0:.2f} of {1} members tested per sample.'.format(np.mean(tested), M))
+        output = ds, options
+
+    return output
+
+
+def _code(ds, classes):
+    # index in classes of each label of ds (one column per member)
+    ds = np.asarray(ds)
+    if ds.ndim == 1:
+        ds = ds[:, np.newaxis]
+    c = np.clip(np.searchsorted(classes, ds), 0, classes.size - 1)
+    bad = classes[c] != ds
+    if np.any(bad):
+        print('Bcl_ensemble: label {0} of a member is not a class of the design data.'.format(ds[bad][0]))
+        exit()
+    return c
+
+
+def _vote(C, B, K):
+    # support of each class: weighted bincount of the class codes (offset per row)
+    n, M = C.shape
+    offset = K * np.arange(n)[:, np.newaxis]
+    return np.bincount((C + offset).ravel(), weights=B.ravel(), minlength=n * K).reshape(n, K)
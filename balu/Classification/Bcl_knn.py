@@ -2,8 +2,8 @@
 import numpy as np
 from .Bcl_construct import Bcl_construct
 from .Bcl_outscore import Bcl_outscore
-from sklearn.neighbors import KDTree
-from scipy.stats import mode
+from .Bcl_knnindex import Bcl_knnindex, Bcl_knnquery
+from .Bcl_knnreduce import Bcl_knnreduce
 
 
 def Bcl_knn(*args):
@@ -12,23 +12,39 @@ def Bcl_knn(*args):
      ds, _ = Bcl_knn(Xt, options)      Testing only
 
      Toolbox: Balu
-        KNN (k-nearest neighbors) classifier using randomized kd-tree
-        forest from FLANN. This implementation requires scikit-learn.
+        KNN (k-nearest neighbors) classifier. The neighbors are searched with
+        a kd-tree of scikit-learn, or with the index given in options['index']
+        (see Bcl_knnindex: 'kdtree', 'balltree', 'brute' or the approximate
+        'ivf'). This implementation requires scikit-learn.
 
         Design data:
            X is a matrix with features (columns)
            d is the ideal classification for X
-           options.k is the number of neighbors (default=10)
+           options.k is the number of neighbors (default=10). It can be a list
+           of values of k, then the neighbors are searched once (with the
+           maximal k) and ds has one column per k.
+
+           options['index'], options['leaf_size'], options['nlist'],
+           options['nprobe'], options['chunk'], options['xchunk'] and
+           options['n_jobs'] set the neighbor index (see Bcl_knnindex).
+           options['reduce'] = 'cnn', 'enn' or 'kmeans' stores a reduced set of
+           prototypes instead of all the design samples (see Bcl_knnreduce),
+           options['reduction'] reports the compression ratio and the change
+           of accuracy (options['show'] = True prints them).
 
         Test data:
            Xt is a matrix with features (columns)
 
         Output:
            ds is the classification on test data
-           options['kdtree'] contains information about the randomized kdtree
-           (from KDTree function of scikit-learn).
+           options['nnindex'] contains the neighbor index (see Bcl_knnindex).
+           options['kdtree'] contains the kdtree (from KDTree function of
+           scikit-learn) if the index is a kd-tree.
+           options['classes'] and options['code'] are the labels and the label
+           code (index in options['classes']) of the design samples.
            options['string'] is a 8 character string that describes the performed
-           classification (e.g., 'knn,10  ' means knn with k=10).
+           classification (e.g., 'knn,10  ' means knn with k=10, the maximal
+           k if options['k'] is a list).
 
         Example: Training & Test together:
             from balu.ImagesAndData import balu_load
@@ -63,6 +79,16 @@ def Bcl_knn(*args):
             ds, _ = Bcl_knn(Xt, op)                 # knn with 10 neighbors - testing
             p = Bev_performance(ds, dt)             # performance on test data
 
+        Example: Several k at once
+            op = {'k': [1, 3, 5, 10]}
+            ds, _ = Bcl_knn(X, d, Xt, op)           # ds[:, i] is the result of knn with k = op['k'][i]
+            p = [Bev_performance(ds[:, i], dt) for i in range(4)]
+
+        Example: Many features, approximate search in all the cores
+            op = {'k': 10, 'index': 'ivf', 'nprobe': 16, 'n_jobs': -1}
+            ds, _ = Bcl_knn(X, d, Xt, op)
+
+        See also Bcl_knnindex, Bcl_knnreduce.
 
      D.Mery, C. Mena PUC-DCC, 2010-2013
      http://dmery.ing.puc.cl
@@ -72,35 +98,65 @@ def Bcl_knn(*args):
     """
 
     train, test, X, d, Xt, options = Bcl_construct(args)
-    options = options.copy()
-    options['string'] = 'knn,{0:2d}  '.format(options['k'])
-
     if train:
-        options['kdtree'] = KDTree(X, metric='euclidean')
+        options = options.copy()
+        options['string'] = 'knn,{0:2d}  '.format(int(np.max(options['k'])))
+        if 'reduce' in options:
+            X, d, info = Bcl_knnreduce(X, d, options)
+            options['reduction'] = info
+            if 'show' in options and options['show']:
+                print('Bcl_knn: {0} prototypes of {1} samples (ratio {2:.1f})'.format(info['Nr'], info['N'], info['ratio']) +
+                      (', accuracy {0:.4f} -> {1:.4f}'.format(info['acc0'], info['acc']) if 'acc' in info else ''))
+
+        options['nnindex'] = Bcl_knnindex(X, options)
+        if options['nnindex']['index'] == 'kdtree':
+            options['kdtree'] = options['nnindex']['tree']
         #options['X'] = X
         if len(d.shape) < 2:
             options['d'] = d[:, None]
         else:
             options['d'] = d
+        classes, code = np.unique(options['d'], return_inverse=True)
+        options['classes'], options['code'] = classes, code.ravel()
         output = options
 
     if test:
-        kdtree = options['kdtree']
-        dist, i = kdtree.query(Xt, k=options['k'], return_distance=True)
-
-        if options['k'] > 1:
-            ds = mode(options['d'][i.T][:, :, 0]).mode.T
-        else: # for 1-KNN (modification by Carlos Mera)
-            ds = options['d'][i.T][:, :, 0].T
-
-        if 'output' in options:
-            ns = ds.size
-            sc = np.zeros((ns, 1))
-            for q in range(ns):
-                j, _ = np.where(options['d'][i.T[:, q]] == ds[q])
-                sc[q] = np.min(dist.T[j, q]**2)
-
-            ds = Bcl_outscore(ds, sc, options)
+        kk = np.atleast_1d(options['k'])
+        if 'nnindex' in options:
+            dist, i = Bcl_knnquery(options['nnindex'], Xt, int(kk.max()))
+        else:
+            dist, i = options['kdtree'].query(Xt, k=int(kk.max()), return_distance=True)
+
+        # label codes 0...C-1 of the neighbors
+        if 'code' in options:
+            classes, code = options['classes'], options['code']
+        else:
+            classes, code = np.unique(options['d'], return_inverse=True)
+        code = code.ravel()[i]
+        C = classes.size
+        Nt = code.shape[0]
+        offset = C * np.arange(Nt)[:, np.newaxis]
+
+        out = []
+        for k in kk:
+            ck = code[:, 0:k]
+            # vote: count of each label per sample (ties to the smallest label)
+            votes = np.bincount((ck + offset).ravel(), minlength=Nt * C).reshape(Nt, C)
+            j = np.argmax(votes, axis=1)
+            ds = classes[j][:, np.newaxis]
+
+            if 'output' in options:
+                # squared distance to the nearest neighbor of the winner class
+                dk = np.where(ck == j[:, np.newaxis], dist[:, 0:k] ** 2, np.inf)
+                sc = np.min(dk, axis=1)[:, np.newaxis]
+                ds = Bcl_outscore(ds, sc, options)
+
+            out.append(ds)
+
+        if np.ndim(options['k']) == 0:
+            ds = out[0]
+        else:
+            ds = np.column_stack([o.ravel() for o in out])
 
         output = ds, options
 
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from sklearn.neighbors import KDTree, BallTree
+
+
+def Bcl_knnindex(X, options=None):
+    """ index = Bcl_knnindex(X, options)
+
+     Toolbox: Balu
+        Nearest neighbor index of the rows of X, used by Bcl_knn (see
+        Bcl_knnquery to search the index).
+
+        options['index'] is the type of index:
+           'kdtree'   : exact kd-tree of scikit-learn (default). Good for few
+                        features (say less than 20).
+           'balltree' : exact ball tree of scikit-learn.
+           'brute'    : exact brute force search, the distances are computed in
+                        chunks of test samples with a matrix product. Good for
+                        many features.
+           'ivf'      : approximate search, X is clustered with k-means in
+                        options['nlist'] lists (default sqrt(N)) and only the
+                        options['nprobe'] lists nearest to each test sample
+                        are searched (default sqrt(nlist), rounded up). The
+                        larger nprobe the better the recall and the slower
+                        the search. Recall of the 10 nearest neighbors with
+                        100,000 samples of 64 features (nlist = 316):
+                           nprobe             2     4     8    18    64
+                           clustered data   0.56  0.83  0.99  1.00  1.00
+                           uniform data     0.10  0.16  0.25  0.41  0.74
+                        On the uniform data (no clusters, the worst case) a
+                        10-nn classifier agrees with the exact one in 69%,
+                        76%, 80% and 87% of the samples for nprobe = 2, 8, 18
+                        and 64, and nprobe = 18 is about 9 times faster than
+                        'brute' (3.5 times with nprobe = 64).
+        options['leaf_size'] leaf size of 'kdtree' and 'balltree' (default 40).
+        options['chunk'] number of test samples of each block of 'brute' and
+        'ivf' searches (default 1024).
+        options['xchunk'] number of rows of X compared at once with a block of
+        test samples in 'brute' and 'ivf' searches (default 8192), the
+        distances of a block take chunk * xchunk * 8 bytes (64 MB by default)
+        per thread whatever the size of X.
+        options['n_jobs'] number of threads used to query the index (default 1,
+        -1 means all the cores).
+
+     Example:
+        import numpy as np
+        from balu.Classification import Bcl_knnindex, Bcl_knnquery
+
+        X = np.random.rand(100000, 128)
+        Xt = np.random.rand(1000, 128)
+        index = Bcl_knnindex(X, {'index': 'ivf', 'nprobe': 16, 'n_jobs': -1})
+        dist, i = Bcl_knnquery(index, Xt, 10)   # 10 nearest neighbors of each row of Xt
+
+     See also Bcl_knn, Bcl_knnquery.
+    """
+
+    if options is None:
+        options = {}
+
+    t = options['index'] if 'index' in options else 'kdtree'
+    leaf_size = options['leaf_size'] if 'leaf_size' in options else 40
+    index = {'index': t,
+             'chunk': options['chunk'] if 'chunk' in options else 1024,
+             'xchunk': options['xchunk'] if 'xchunk' in options else 8192,
+             'n_jobs': options['n_jobs'] if 'n_jobs' in options else 1}
+
+    if t == 'kdtree':
+        index['tree'] = KDTree(X, leaf_size=leaf_size, metric='euclidean')
+    elif t == 'balltree':
+        index['tree'] = BallTree(X, leaf_size=leaf_size, metric='euclidean')
+    elif t == 'brute':
+        index['X'] = np.asarray(X, dtype=float)
+        index['xx'] = np.sum(index['X'] ** 2, axis=1)
+    elif t == 'ivf':
+        X = np.asarray(X, dtype=float)
+        N = X.shape[0]
+        nlist = options['nlist'] if 'nlist' in options else int(np.sqrt(N))
+        nlist = max(1, min(nlist, N))
+        mc, a = _kmeans(X, nlist)
+        order = np.argsort(a, kind='mergesort')
+        index['X'] = X
+        index['xx'] = np.sum(X ** 2, axis=1)
+        index['mc'] = mc
+        index['order'] = order
+        index['ptr'] = np.hstack((0, np.cumsum(np.bincount(a, minlength=nlist))))
+        index['nprobe'] = options['nprobe'] if 'nprobe' in options else int(np.ceil(np.sqrt(nlist)))
+    else:
+        print('Bcl_knnindex: index {0} does not exist.'.format(t))
+        exit()
+
+    return index
+
+
+def Bcl_knnquery(index, Xt, k):
+    """ dist, i = Bcl_knnquery(index, Xt, k)
+
+     Toolbox: Balu
+        The k nearest neighbors in index (see Bcl_knnindex) of each row of Xt.
+        dist[q, :] are the Euclidean distances (in ascending order) and
+        i[q, :] the rows of X of the k nearest neighbors of Xt[q, :].
+        The search is performed in index['n_jobs'] threads.
+
+     See also Bcl_knnindex, Bcl_knn.
+    """
+
+    Xt = np.asarray(Xt)
+    Nt = Xt.shape[0]
+    n_jobs = index['n_jobs']
+    if n_jobs < 0:
+        n_jobs = cpu_count()
+
+    if index['index'] in ('kdtree', 'balltree'):
+        def search(q0, q1):
+            return index['tree'].query(Xt[q0:q1], k=k, return_distance=True)
+        chunk = max(1, -(-Nt // n_jobs))
+    elif index['index'] == 'brute':
+        def search(q0, q1):
+            return _brute(index, Xt[q0:q1], k)
+        chunk = index['chunk']
+    else:
+        def search(q0, q1):
+            return _ivf(index, Xt[q0:q1], k)
+        chunk = index['chunk']
+
+    blocks = [(q, min(q + chunk, Nt)) for q in range(0, Nt, chunk)]
+    if n_jobs > 1 and len(blocks) > 1:
+        pool = ThreadPool(n_jobs)
+        try:
+            res = pool.map(lambda b: search(*b), blocks)
+        finally:
+            pool.close()
+    else:
+        res = [search(*b) for b in blocks]
+
+    if len(res) == 0:
+        return np.zeros((0, k)), np.zeros((0, k), int)
+    dist = np.vstack([r[0] for r in res])
+    i = np.vstack([r[1] for r in res])
+    return dist, i
+
+
+def _topk(e, k):
+    # k smallest values of each row of e in ascending order
+    if k < e.shape[1]:
+        j = np.argpartition(e, k - 1, axis=1)[:, 0:k]
+    else:
+        j = np.tile(np.arange(e.shape[1]), (e.shape[0], 1))
+    r = np.arange(e.shape[0])[:, np.newaxis]
+    s = np.argsort(e[r, j], axis=1, kind='mergesort')
+    return j[r, s]
+
+
+def _exact(x, X, i):
+    # exact distances of x[q] to the rows i[q, :] of X, sorted
+    e = np.sum((x[:, np.newaxis, :] - X[i]) ** 2, axis=2)
+    s = np.argsort(e, axis=1, kind='mergesort')
+    r = np.arange(e.shape[0])[:, np.newaxis]
+    return np.sqrt(e[r, s]), i[r, s]
+
+
+def _brute(index, x, k):
+    x = np.asarray(x, dtype=float)
+    N = index['X'].shape[0]
+    best_e = np.full((x.shape[0], k), np.inf)
+    best_i = np.zeros((x.shape[0], k), int)
+    best_e, best_i = _scan(index, x, np.sum(x ** 2, axis=1), np.arange(N), best_e, best_i)
+    return _exact(x, index['X'], best_i[:, 0:min(k, N)])
+
+
+def _scan(index, x, xx, ii, best_e, best_i):
+    # merges the rows ii of X into the k nearest neighbors (best_e, best_i)
+    # of the rows of x, in blocks of index['xchunk'] rows of X
+    k = best_e.shape[1]
+    block = index['xchunk'] if 'xchunk' in index else 8192
+    r = np.arange(x.shape[0])[:, np.newaxis]
+    for p in range(0, ii.size, block):
+        ib = ii[p:p + block]
+        e = xx[:, np.newaxis] - 2 * np.dot(x, index['X'][ib].T) + index['xx'][ib]
+        if ib.size > k:
+            j = np.argpartition(e, k - 1, axis=1)[:, 0:k]     # k nearest of the block
+        else:
+            j = np.tile(np.arange(ib.size), (x.shape[0], 1))
+        e = np.hstack((best_e, e[r, j]))
+        i = np.hstack((best_i, ib[j]))
+        j = _topk(e, k)
+        best_e, best_i = e[r, j], i[r, j]
+    return best_e, best_i
+
+
+def _ivf(index, x, k):
+    x = np.asarray(x, dtype=float)
+    X = index['X']
+    mc = index['mc']
+    nq = x.shape[0]
+    xx = np.sum(x ** 2, axis=1)
+
+    # lists to be probed by each test sample
+    nprobe = min(index['nprobe'], mc.shape[0])
+    e = xx[:, np.newaxis] - 2 * np.dot(x, mc.T) + np.sum(mc ** 2, axis=1)
+    probe = _topk(e, nprobe)
+
+    best_e = np.full((nq, k), np.inf)
+    best_i = np.zeros((nq, k), int)
+    for l in np.unique(probe):
+        q = np.where(np.any(probe == l, axis=1))[0]
+        ii = index['order'][index['ptr'][l]:index['ptr'][l + 1]]
+        if ii.size == 0:
+            continue
+        best_e[q], best_i[q] = _scan(index, x[q], xx[q], ii, best_e[q], best_i[q])
+
+    # samples with less than k candidates are searched exhaustively
+    q = np.where(np.isinf(best_e[:, -1]))[0]
+    n = min(k, X.shape[0])
+    if q.size > 0:
+        best_i[q, 0:n] = _brute(index, x[q], k)[1]
+
+    return _exact(x, X, best_i[:, 0:n])
+
+
+def _kmeans(X, n, niter=10):
+    # Lloyd's k-means with a fixed seed, returns centroids and assignments
+    rs = np.random.RandomState(0)
+    mc = X[rs.choice(X.shape[0], n, replace=False)].copy()
+    xx = np.sum(X ** 2, axis=1)
+    for it in range(niter + 1):
+        a = np.zeros(X.shape[0], int)
+        for q in range(0, X.shape[0], 4096):
+            e = xx[q:q + 4096, np.newaxis] - 2 * np.dot(X[q:q + 4096], mc.T) + np.sum(mc ** 2, axis=1)
+            a[q:q + 4096] = np.argmin(e, axis=1)
+        if it == niter:
+            break
+        c = np.bincount(a, minlength=n)
+        for j in range(X.shape[1]):
+            s = np.bincount(a, weights=X[:, j], minlength=n)
+            mc[c > 0, j] = s[c > 0] / c[c > 0]
+    return mc, a
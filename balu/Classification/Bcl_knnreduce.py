@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from .Bcl_knnindex import Bcl_knnindex, Bcl_knnquery, _kmeans
+
+
+def Bcl_knnreduce(X, d, options):
+    """ Xr, dr, info = Bcl_knnreduce(X, d, options)
+
+     Toolbox: Balu
+        Prototype reduction of the design data (X, d) of a KNN classifier.
+
+        options['reduce'] is the reduction method:
+           'cnn'    : condensed nearest neighbor (Hart, 1968). Only the samples
+                      needed to classify the design data with 1-NN are kept
+                      (the samples are added in blocks of options['block'],
+                      default 256, until no sample is misclassified). The
+                      condensed set grows in place, it is not copied for
+                      each block.
+           'enn'    : edited nearest neighbor (Wilson, 1972). The samples that
+                      are misclassified by their options['k'] nearest neighbors
+                      are removed.
+           'kmeans' : options['nproto'] prototypes per class (default 10),
+                      the centroids of the k-means clustering of each class.
+        options['k'] is the number of neighbors of the KNN classifier (the
+        maximum if it is a list).
+
+        Xr, dr are the reduced design data.
+        info['ratio'] is the compression ratio N / Nr, info['acc0'] and
+        info['acc'] are the accuracies of the KNN classifier with the original
+        and with the reduced data and info['change'] = info['acc'] -
+        info['acc0']. They are estimated (leave-one-out: a sample is not its
+        own neighbor) on options['nacc'] design samples chosen at random
+        (default 10000, all of them if N is smaller), thus their cost does
+        not grow with N^2 (info['nacc'] is the number of samples of the
+        estimate). options['nacc'] = 0 does not estimate them.
+
+     Example:
+        from balu.ImagesAndData import balu_load
+        from balu.Classification import Bcl_knn, Bcl_knnreduce
+
+        data = balu_load('datareal')
+        Xr, dr, info = Bcl_knnreduce(data['f'], data['d'], {'k': 5, 'reduce': 'cnn'})
+        print(info['ratio'], info['change'])
+        op = Bcl_knn(data['f'], data['d'], {'k': 5, 'reduce': 'cnn'})   # the same inside Bcl_knn
+
+     See also Bcl_knn, Bcl_knnindex.
+    """
+
+    X = np.asarray(X, dtype=float)
+    d = np.asarray(d).ravel()
+    N = X.shape[0]
+    k = int(np.max(options['k'])) if 'k' in options else 10
+    t = options['reduce']
+
+    if t == 'cnn':
+        i = _cnn(X, d, options['block'] if 'block' in options else 256)
+    elif t == 'enn':
+        i = _enn(X, d, k)
+    elif t == 'kmeans':
+        i = None
+    else:
+        print('Bcl_knnreduce: reduction {0} does not exist.'.format(t))
+        exit()
+
+    if i is None:
+        nproto = options['nproto'] if 'nproto' in options else 10
+        Xr = []
+        dr = []
+        for c in np.unique(d):
+            Xc = X[d == c]
+            if Xc.shape[0] > nproto:
+                Xc = _kmeans(Xc, nproto)[0]
+            Xr.append(Xc)
+            dr.append(np.repeat(c, Xc.shape[0]))
+        Xr = np.vstack(Xr)
+        dr = np.hstack(dr)
+        pos = None
+    else:
+        Xr = X[i]
+        dr = d[i]
+        pos = np.zeros(N, int) - 1
+        pos[i] = np.arange(i.size)
+
+    info = {'reduce': t, 'N': N, 'Nr': Xr.shape[0], 'ratio': N / float(Xr.shape[0])}
+    nacc = options['nacc'] if 'nacc' in options else 10000
+    if nacc > 0:
+        v = np.arange(N) if N <= nacc else np.sort(np.random.RandomState(0).choice(N, nacc, replace=False))
+        info['nacc'] = v.size
+        info['acc0'] = _accuracy(X, d, X[v], d[v], k, v)
+        info['acc'] = _accuracy(Xr, dr, X[v], d[v], k, None if pos is None else pos[v])
+        info['change'] = info['acc'] - info['acc0']
+
+    return Xr, dr[:, np.newaxis], info
+
+
+def _vote(code, C):
+    # majority vote of each row of label codes (ties to the smallest code)
+    n = code.shape[0]
+    offset = C * np.arange(n)[:, np.newaxis]
+    return np.argmax(np.bincount((code + offset).ravel(), minlength=n * C).reshape(n, C), axis=1)
+
+
+def _neighbors(Xs, Xq, k, pos):
+    # k nearest neighbors in Xs of the rows of Xq, excluding Xq[q] itself
+    # (the row pos[q] of Xs, -1 if it is not in Xs)
+    k = min(k, Xs.shape[0] - 1) if pos is not None else min(k, Xs.shape[0])
+    index = Bcl_knnindex(Xs, {'index': 'kdtree' if Xs.shape[1] <= 20 else 'brute'})
+    if pos is None:
+        return Bcl_knnquery(index, Xq, k)[1]
+    i = Bcl_knnquery(index, Xq, k + 1)[1]
+    own = i == pos[:, np.newaxis]
+    own[~own.any(axis=1), -1] = True
+    return i[~own].reshape(i.shape[0], k)
+
+
+def _accuracy(Xs, ds, X, d, k, pos):
+    classes, code = np.unique(np.hstack((ds, d)), return_inverse=True)
+    cs = code[0:ds.size]
+    c = code[ds.size:]
+    j = _vote(cs[_neighbors(Xs, X, k, pos)], classes.size)
+    return np.mean(j == c)
+
+
+def _enn(X, d, k):
+    classes, code = np.unique(d, return_inverse=True)
+    j = _vote(code[_neighbors(X, X, k, np.arange(X.shape[0]))], classes.size)
+    return np.where(j == code)[0]
+
+
+def _cnn(X, d, block):
+    N = X.shape[0]
+    order = np.random.RandomState(0).permutation(N)
+    _, first = np.unique(d[order], return_index=True)
+    keep = np.zeros(N, bool)
+    keep[order[first]] = True                       # one sample per class
+
+    # brute force index of the condensed set S (rows i of X), the samples are
+    # appended in place and the capacity is doubled when it is full
+    i = np.where(keep)[0]
+    n = i.size
+    index = Bcl_knnindex(np.zeros((max(1024, 2 * n), X.shape[1])), {'index': 'brute'})
+    S, xx = index['X'], index['xx']
+    i = np.hstack((i, np.zeros(S.shape[0] - n, int)))
+    S[0:n] = X[i[0:n]]
+    xx[0:n] = np.sum(S[0:n] ** 2, axis=1)
+
+    changed = True
+    while changed:
+        changed = False
+        for q in range(0, N, block):
+            b = order[q:q + block]
+            b = b[~keep[b]]
+            if b.size == 0:
+                continue
+            index['X'], index['xx'] = S[0:n], xx[0:n]
+            j = i[Bcl_knnquery(index, X[b], 1)[1][:, 0]]
+            wrong = b[d[j] != d[b]]
+            if wrong.size > 0:
+                keep[wrong] = True
+                changed = True
+                if n + wrong.size > S.shape[0]:
+                    c = max(2 * S.shape[0], n + wrong.size)
+                    S = np.vstack((S[0:n], np.zeros((c - n, X.shape[1]))))
+                    xx = np.hstack((xx[0:n], np.zeros(c - n)))
+                    i = np.hstack((i[0:n], np.zeros(c - n, int)))
+                S[n:n + wrong.size] = X[wrong]
+                xx[n:n + wrong.size] = np.sum(X[wrong] ** 2, axis=1)
+                i[n:n + wrong.size] = wrong
+                n += wrong.size
+    return np.where(keep)[0]
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 from .Bcl_construct import Bcl_construct
-from .Bcl_outscore import Bcl_outscore
+from .Bcl_outscore import Bcl_outscore, _param, _gap
+from .Bcl_dtype import _dtype
 
 
 def Bcl_lda(*args):
@@ -27,6 +28,20 @@ def Bcl_lda(*args):
            ds is the classification on test data
            options['dmin'] contains np.min(d).
            options['Cw1'] is pinv(within-class covariance).
+           options['W'] and options['b'] are the weights (m x K) and the bias
+           (K elements) of the discriminant functions of the data centered at
+           options['c0'] (mean of the centroids), D = (Xt - c0) * W + b +
+           (Xt - c0) * w0 + b0, where the last term (options['w0'] and
+           options['b0']) is the same for all the classes. The centered form
+           has less rounding errors in float32 on uncentered data.
+           options['chunk'] number of test samples processed at once (default
+           4096), Xt can be a memory-mapped array (see numpy.load, mmap_mode).
+           options['dtype'] = 'float32' or 'float64' is the type of the
+           parameters and of the test computations (default: Bcl_dtype()).
+           options['output'] = 3 gives as score the sigmoid of the gap between
+           the two best discriminant functions, fitted in training to the
+           correct decisions on the design data (options['param'], see
+           Bft_sigmoid and Bcl_outscore).
            options['mc'] contains the centroids of each class.
            options['string'] is a 8 character string that describes the performed
            classification (in this case 'lda     ').
@@ -83,25 +98,17 @@ def Bcl_lda(*args):
     """
 
     train, test, X, d, Xt, options = Bcl_construct(args)
-    options = options.copy()
-    options['string'] = 'lda     '
     if len(d.shape) < 2:
         d = np.expand_dims(d, axis=1)
 
     if train:
+        options = options.copy()
+        options['string'] = 'lda     '
         dmin = np.amin(d)
         dmax = np.amax(d)
         d = d - dmin + 1
-        N = d.size              # number of samples
         K = int(dmax - dmin + 1)     # number of classes
 
-        options['p'] = np.array(options['p'])
-        pest = options['p'].size == 0
-
-        p = np.zeros(K)
-        if not pest:
-            p[:] = options['p']
-
         m = X.shape[1]
         L = np.zeros((K, 1))
         Cw = np.zeros((m, m))
@@ -114,34 +121,96 @@ def Bcl_lda(*args):
                 exit()
             L[k, 0] = ii.size                   # number of samples in class k
             Xk = X[ii, :]                       # samples of class k
-            mc[:, k] = np.mean(Xk, axis=0).T   # mean of class k
+            mc[:, k] = np.mean(Xk, axis=0, dtype=np.float64)   # mean of class k
             Ck = np.cov(Xk, rowvar=False)                     # covariance of class k
             Cw = Cw + Ck * (L[k, 0] - 1)        # within-class covariance
 
-            if pest:
-                p[k] = L[k, 0] / N
-
-        Cw /= (N - K)
-        options['Cw1'] = np.linalg.pinv(Cw)
-        options['dmin'] = dmin
-        options['mc'] = mc
-        options['p'] = p
+        options = _fit(options, dmin, mc, Cw, L)
+        options = _param(options, _scores, X, d)
         output = options
 
     if test:
-        K = options['mc'].shape[1]
         Nt = Xt.shape[0]
-        D = np.zeros((Nt, K))
-        for k in range(int(K)):
-            C1 = np.dot(options['Cw1'], options['mc'][:, k][np.newaxis].T)
-            C2 = (-0.5 * np.dot(options['mc'][:, k].T, C1) + np.log(options['p'][k])) * np.ones((Nt, 1))
-            D[:, k] = np.squeeze(np.dot(Xt, C1) + C2)
-
-        a = np.amax(D, axis=1)
-        i, j = np.unravel_index(np.argmax(D, axis=1), D.shape)
-        sc = np.ones(a.size) / (np.abs(a) + 1e-5)
+        j = np.zeros(Nt, int)
+        a = np.zeros(Nt)
+        out3 = 'output' in options and options['output'] == 3
+        chunk = options['chunk'] if 'chunk' in options else 4096
+        op = _prepare(options)
+        for q in range(0, Nt, chunk):
+            x = Xt[q:q + chunk, :]
+            D = _scores(op, x)
+            j[q:q + chunk] = np.argmax(D, axis=1)
+            a[q:q + chunk] = np.amax(D, axis=1) + _common(op, x) if not out3 else _gap(D)
+
+        sc = np.ones(a.size) / (np.abs(a) + 1e-5) if not out3 else a
         ds = j + options['dmin']
         ds = Bcl_outscore(ds, sc, options)
         output = ds, options
 
     return output
+
+
+def _fit(options, dmin, mc, Cw, L):
+    # options of a trained classifier from the centroids (mc), the number of
+    # samples (L) and the within-class scatter (Cw) of the classes (see Bcl_finalize)
+    K = mc.shape[1]
+    N = L.sum()                             # number of samples
+
+    options['p'] = np.array(options['p'])
+    p = np.zeros(K)
+    if options['p'].size == 0:
+        p[:] = L[:, 0] / N
+    else:
+        p[:] = options['p']
+
+    options['Cw1'] = np.linalg.pinv(Cw / (N - K))
+    options['dmin'] = dmin
+    options['mc'] = mc
+    options['p'] = p
+    c0 = np.mean(mc, axis=1)                # center of the classes
+    options['mc'] = mc - c0[:, np.newaxis]
+    W, b = _discriminant(options)
+    w0 = np.dot(options['Cw1'], c0)         # term of all the classes
+    dt = _dtype(options)
+    options['mc'] = mc.astype(dt)
+    options['c0'] = c0.astype(dt)
+    options['W'], options['b'] = W.astype(dt), b.astype(dt)
+    options['w0'], options['b0'] = w0.astype(dt), dt.type(0.5 * np.dot(c0, w0))
+    return options
+
+
+def _prepare(options):
+    # options with the discriminant functions (computed once for the models
+    # trained without them)
+    if 'W' in options:
+        return options
+    W, b = _discriminant(options)
+    return dict(options, W=W, b=b)
+
+
+def _scores(options, x):
+    # discriminant functions of the classes for the rows of x, but the term
+    # that is the same for all the classes (see _common)
+    if 'W' in options:
+        W, b = options['W'], options['b']
+    else:
+        W, b = _discriminant(options)
+    x = np.asarray(x, dtype=W.dtype)
+    if 'c0' in options:
+        x = x - options['c0']
+    return np.dot(x, W) + b
+
+
+def _common(options, x):
+    # term of the discriminant functions that is the same for all the classes
+    if 'c0' not in options:
+        return np.zeros(x.shape[0])
+    x = np.asarray(x, dtype=options['w0'].dtype) - options['c0']
+    return np.dot(x, options['w0']) + options['b0']
+
+
+def _discriminant(options):
+    # D[:, k] = Xt * Cw1 * mc[:, k] - 0.5 * mc[:, k]' * Cw1 * mc[:, k] + log(p[k])
+    W = np.dot(options['Cw1'], options['mc'])
+    b = -0.5 * np.sum(options['mc'] * W, axis=0) + np.log(options['p'])
+    return W, b
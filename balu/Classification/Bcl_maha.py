@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 from .Bcl_construct import Bcl_construct
-from .Bcl_outscore import Bcl_outscore
+from .Bcl_outscore import Bcl_outscore, _param, _gap
+from .Bcl_dtype import _dtype
 
 
 def Bcl_maha(*args):
@@ -24,6 +25,16 @@ def Bcl_maha(*args):
            options['mc'] contains the centroids of each class.
            options['dmin'] contains min(d).
            options['Ck'] is covariance matrix of each class.
+           options['Wk'] is the whitening matrix of each class, i.e.
+           Wk[:, :, k] * Wk[:, :, k]' = inv(Ck[:, :, k]) (Cholesky factorization,
+           or eigendecomposition with pseudo-inverse if Ck is singular).
+           options['chunk'] number of test samples processed at once (default 4096).
+           options['dtype'] = 'float32' or 'float64' is the type of the
+           parameters and of the test computations (default: Bcl_dtype()).
+           options['output'] = 3 gives as score the sigmoid of the gap between
+           the two best discriminant functions, fitted in training to the
+           correct decisions on the design data (options['param'], see
+           Bft_sigmoid and Bcl_outscore).
            options['string'] is a 8 character string that describes the performed
            classification (in this case 'maha    ').
 
@@ -76,10 +87,9 @@ def Bcl_maha(*args):
     if options is None:
         options = {}
 
-    options = options.copy()
-
-    options['string'] = 'maha    '
     if train:
+        options = options.copy()
+        options['string'] = 'maha    '
         m = X.shape[1]
         dmin = d.min()
         dmax = d.max()
@@ -90,40 +100,80 @@ def Bcl_maha(*args):
         Ck = np.zeros((M, M, n))
         for i in range(int(n)):
             ii, _ = np.where(d == i + 1)
-            mc[i, :] = np.mean(X[ii, :], axis=0)
+            mc[i, :] = np.mean(X[ii, :], axis=0, dtype=np.float64)
             CCk = np.cov(X[ii, :], rowvar=False)                     # covariance of class i
             Ck[:, :, i] = CCk
 
-        options['mc'] = mc
-        options['dmin'] = dmin
-        options['Ck'] = Ck
+        options = _fit(options, dmin, mc, Ck)
+        options = _param(options, _scores, X, d)
         output = options
 
     if test:
-        mc = options['mc']
-        n = mc.shape[0]
         Nt = Xt.shape[0]
         ds = np.zeros((Nt, 1))
         sc = ds.copy()
-        M = Xt.shape[1]
-
-        Ck = np.zeros((M, M, n))
-        for k in range(n):
-            Ck[:, :, k] = np.linalg.pinv(options['Ck'][:, :, k])
 
-        for q in range(Nt):
-            dk = np.zeros((n, 1))
-            for k in range(n):
-                dx = Xt[q, :] - options['mc'][k, :]
-                dk[k] = np.dot(dx, np.dot(Ck[:, :, k], dx.T))
+        out3 = 'output' in options and options['output'] == 3
+        chunk = options['chunk'] if 'chunk' in options else 4096
+        op = _prepare(options)
 
-            i = np.min(dk, axis=0)
-            j = np.argmin(dk, axis=0)
-            ds[q, 0] = j + 1
-            sc[q, 0] = i
+        for q in range(0, Nt, chunk):
+            dk = -_scores(op, Xt[q:q + chunk, :])
+            j = np.argmin(dk, axis=1)
+            ds[q:q + chunk, 0] = j + 1
+            sc[q:q + chunk, 0] = dk[np.arange(j.size), j] if not out3 else _gap(-dk)
 
         ds = ds + options['dmin'] - 1
         ds = Bcl_outscore(ds, sc, options)
         output = ds, options
 
     return output
+
+
+def _fit(options, dmin, mc, Ck):
+    # options of a trained classifier from the centroids and covariances of
+    # the classes (see Bcl_finalize)
+    dt = _dtype(options)
+    options['mc'] = mc.astype(dt)
+    options['dmin'] = dmin
+    options['Ck'] = Ck
+    options['Wk'] = _whitening(Ck).astype(dt)
+    return options
+
+
+def _prepare(options):
+    # options with the whitening matrices (computed once for the models
+    # trained without them)
+    if 'Wk' in options:
+        return options
+    return dict(options, Wk=_whitening(options['Ck']))
+
+
+def _scores(options, x):
+    # minus the squared Mahalanobis distances of the rows of x to the classes
+    mc = options['mc']
+    Wk = options['Wk'] if 'Wk' in options else _whitening(options['Ck'])
+    x = np.asarray(x, dtype=mc.dtype)
+    dk = np.zeros((x.shape[0], mc.shape[0]))
+    for k in range(mc.shape[0]):
+        Z = np.dot(x - mc[k, :], Wk[:, :, k])
+        dk[:, k] = np.sum(Z * Z, axis=1)
+    return -dk
+
+
+def _whitening(Ck):
+    # W with W*W' = pinv(C) for each class, then dx*pinv(C)*dx' = ||dx*W||^2
+    M, _, n = Ck.shape
+    Wk = np.zeros((M, M, n))
+    for k in range(n):
+        C = Ck[:, :, k]
+        s, V = np.linalg.eigh(C)
+        t = s > 1e-15 * np.abs(s).max()
+        if t.all():
+            try:
+                Wk[:, :, k] = np.linalg.inv(np.linalg.cholesky(C)).T
+                continue
+            except np.linalg.LinAlgError:
+                pass                        # not numerically positive definite
+        Wk[:, :t.sum(), k] = V[:, t] / np.sqrt(s[t])
+    return Wk
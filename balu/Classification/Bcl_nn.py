@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import numpy as np
+import copy
 from .Bcl_construct import Bcl_construct
 from sklearn.neural_network import MLPClassifier
 
@@ -18,6 +19,20 @@ def Bcl_nn(*args):
            options['method'] = 0, 1, 2, 3 for 'identity','tanh' or 'relu' (default=3)
            options['iter'] is the max. number of iterations used in the MLPClassifier.fit algorithm
            (default=100).
+           options['solver'] = 'lbfgs' (full batch, default), 'adam' or 'sgd'
+           (mini-batch).
+           options['batch_size'] size of the mini-batches of 'adam' and 'sgd'
+           (default min(200, number of samples)).
+           options['early_stopping'] = True stops the training of 'adam' and 'sgd'
+           when the accuracy on a held-out 10% of X does not improve. A number
+           between 0 and 1 is the held-out fraction.
+           options['warm_start'] = True continues the training of the network in
+           options['net'] (if any) instead of starting a new one.
+           options['partial'] = True trains the network with one pass over X
+           (partial_fit of MLPClassifier), to train on a stream of chunks calling
+           Bcl_nn with the options of the previous chunk. The labels of all the
+           classes must be given in options['classes'] (default: the labels
+           of the first chunk). Solver 'lbfgs' is replaced by 'adam'.
 
         Test data:
            Xt is a matrix with features (columns)
@@ -62,6 +77,11 @@ def Bcl_nn(*args):
             ds, _ = Bcl_nn(Xt, op)                  # logistic - neural network - testing
             p = Bev_performance(ds, dt)             # performance on test data
 
+        Example: Training on a stream of chunks
+            op = {'method': 3, 'solver': 'adam', 'partial': True, 'classes': [1, 2]}
+            for q in range(0, X.shape[0], 100):
+                op = Bcl_nn(X[q:q + 100], d[q:q + 100], op)
+
 
         Implementation based on Bcl_nnlgm from Balu Matlab toolbox and Neural Network function
         from scikit-learn.
@@ -80,13 +100,11 @@ def Bcl_nn(*args):
     if len(d.shape) < 2:
         d = np.expand_dims(d, axis=1)
 
-    options = options.copy()
-
-    if 'iter' not in options:
-        options['iter'] = 100
-
-    options['string'] = 'nn,{0}    '.format(options['method'])
     if train:
+        options = options.copy()
+        if 'iter' not in options:
+            options['iter'] = 100
+        options['string'] = 'nn,{0}    '.format(options['method'])
 
         all_activation_functions = ['identity', 'logistic', 'tanh', 'relu']
         m = 'relu'
@@ -98,9 +116,39 @@ def Bcl_nn(*args):
             m = c
 
         dmin = d.min()
-
-        net = MLPClassifier(solver='lbfgs', activation=m, max_iter=options['iter'])
-        net.fit(X, d.ravel())
+        if 'dmin' in options and 'net' in options:
+            dmin = min(dmin, options['dmin'])
+
+        solver = options['solver'] if 'solver' in options else 'lbfgs'
+        partial = 'partial' in options and options['partial']
+        if partial and solver == 'lbfgs':
+            solver = 'adam'
+        warm = partial or ('warm_start' in options and options['warm_start'])
+
+        if warm and 'net' in options:
+            net = copy.deepcopy(options['net'])
+            if not partial:
+                net.set_params(warm_start=True, max_iter=options['iter'])
+        else:
+            params = {'solver': solver, 'activation': m, 'max_iter': options['iter']}
+            if 'batch_size' in options:
+                params['batch_size'] = options['batch_size']
+            es = options['early_stopping'] if 'early_stopping' in options else False
+            if es is not False:
+                params['early_stopping'] = True
+                params['validation_fraction'] = 0.1 if es is True else float(es)
+            net = MLPClassifier(**params)
+
+        if partial:
+            if hasattr(net, 'classes_'):
+                classes = net.classes_
+            elif 'classes' in options:
+                classes = options['classes']
+            else:
+                classes = np.unique(d)
+            net.partial_fit(X, d.ravel(), classes=classes)
+        else:
+            net.fit(X, d.ravel())
         options['net'] = net
         options['dmin'] = dmin
         output = options
@@ -17,3 +17,27 @@ def Bcl_outscore(ds, score, options):
         ds = np.concatenate((ds.ravel(), (Bft_sigmoid(score, options['param']) - 0.5).ravel() * 2))
 
     return ds
+
+
+def _param(options, scores, X, d):
+    # options['param'] of the sigmoid of output 3 (see Bft_sigmoid): logistic
+    # fit of the correct decisions on the design data (d = 1, 2, ...) to the
+    # gap of the discriminant functions scores(options, X) of the classifier
+    if 'output' in options and options['output'] == 3 and 'param' not in options:
+        g = scores(options, X)
+        ok = np.argmax(g, axis=1) == np.ravel(d) - 1
+        # plus a correct and a wrong decision at gap 0 (tie of the two best
+        # classes), the fit is defined even if all the decisions are correct
+        param = Bft_sigmoid(np.hstack((_gap(g), 0, 0)), np.hstack((ok, True, False)).astype(int))
+        if param[0] <= 0:
+            print('Bcl_outscore: the sigmoid of the scores does not increase with the gap (a = {0:.3g}).'.format(param[0]))
+        options['param'] = param
+    return options
+
+
+def _gap(g):
+    # difference between the two largest discriminant functions of each row
+    if g.shape[1] < 2:
+        return np.zeros(g.shape[0])
+    g2 = np.partition(np.asarray(g, dtype=float), -2, axis=1)
+    return g2[:, -1] - g2[:, -2]
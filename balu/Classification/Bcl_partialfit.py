@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from .Bcl_dmin import _fit as _fit_dmin
+from .Bcl_maha import _fit as _fit_maha
+from .Bcl_lda import _fit as _fit_lda
+from .Bcl_qda import _fit as _fit_qda
+
+
+def Bcl_partialfit(X, d, stats=None):
+    """ stats = Bcl_partialfit(X, d, stats)
+     stats = Bcl_partialfit(X, d)
+
+     Toolbox: Balu
+        Incremental training of Bcl_dmin, Bcl_maha, Bcl_lda and Bcl_qda.
+
+        The sufficient statistics of each class (number of samples, mean and
+        sum of the outer products of the centered samples) of the mini-batch
+        X, d are merged into stats (the merge of Chan, Golub & LeVeque, a
+        pairwise version of Welford's algorithm, that is stable for long
+        streams). Without stats a new one is started. Bcl_finalize converts
+        stats into the options of a trained classifier.
+
+        stats['classes'] are the labels seen so far, stats['n'][k],
+        stats['mean'][k, :] and stats['M2'][:, :, k] are the statistics of
+        class stats['classes'][k].
+
+     Example:
+        import numpy as np
+        from balu.Classification import Bcl_partialfit, Bcl_finalize, Bcl_lda
+
+        X = np.load('features.npy', mmap_mode='r')     # does not fit in RAM
+        d = np.load('labels.npy', mmap_mode='r')
+        stats = None
+        for q in range(0, X.shape[0], 100000):
+            stats = Bcl_partialfit(X[q:q + 100000], d[q:q + 100000], stats)
+        op = Bcl_finalize(stats, 'lda', {'p': []})
+        ds, _ = Bcl_lda(Xt, op)
+
+     See also Bcl_finalize, Bcl_dmin, Bcl_maha, Bcl_lda, Bcl_qda.
+    """
+
+    X = np.asarray(X, dtype=float)
+    d = np.asarray(d).ravel()
+    m = X.shape[1]
+
+    if stats is None:
+        stats = {'classes': np.zeros(0), 'n': np.zeros(0), 'mean': np.zeros((0, m)), 'M2': np.zeros((m, m, 0))}
+
+    classes = np.union1d(stats['classes'], np.unique(d))
+    if classes.size > stats['classes'].size:
+        # room for the new classes
+        K = classes.size
+        k = np.searchsorted(classes, stats['classes'])
+        n = np.zeros(K)
+        mean = np.zeros((K, m))
+        M2 = np.zeros((m, m, K))
+        n[k] = stats['n']
+        mean[k] = stats['mean']
+        M2[:, :, k] = stats['M2']
+        stats = {'classes': classes, 'n': n, 'mean': mean, 'M2': M2}
+
+    for c in np.unique(d):
+        k = np.searchsorted(classes, c)
+        Xk = X[d == c, :]
+        nb = Xk.shape[0]
+        mb = np.mean(Xk, axis=0)
+        Z = Xk - mb
+        M2b = np.dot(Z.T, Z)
+
+        na = stats['n'][k]
+        n = na + nb
+        delta = mb - stats['mean'][k]
+        stats['mean'][k] += delta * (nb / n)
+        stats['M2'][:, :, k] += M2b + np.outer(delta, delta) * (na * nb / n)
+        stats['n'][k] = n
+
+    return stats
+
+
+def Bcl_finalize(stats, name, options=None):
+    """ options = Bcl_finalize(stats, name, options)
+
+     Toolbox: Balu
+        Options of a trained classifier ('dmin', 'maha', 'lda' or 'qda')
+        from the statistics accumulated by Bcl_partialfit. The result is the
+        same as training the classifier with all the mini-batches together,
+        e.g. Bcl_finalize(stats, 'lda', {'p': []}) ~ Bcl_lda(X, d, {'p': []}).
+
+        The classes are min(d), min(d) + 1, ..., max(d) as in the classifiers.
+
+     See also Bcl_partialfit.
+    """
+
+    if name[0:4] == 'Bcl_':
+        name = name[4:]
+    if options is None:
+        options = {}
+    options = options.copy()
+
+    classes = stats['classes']
+    dmin = classes.min()
+    K = int(classes.max() - dmin + 1)
+    m = stats['mean'].shape[1]
+    k = (classes - dmin).astype(int)
+
+    L = np.zeros((K, 1))
+    mc = np.zeros((K, m)) + np.nan
+    M2 = np.zeros((m, m, K))
+    L[k, 0] = stats['n']
+    mc[k] = stats['mean']
+    M2[:, :, k] = stats['M2']
+
+    if name == 'dmin':
+        options['string'] = 'dmin    '
+        options = _fit_dmin(options, dmin, mc)
+    elif name == 'maha':
+        options['string'] = 'maha    '
+        options = _fit_maha(options, dmin, mc, _covariances('Bcl_maha', L, M2, dmin))
+    elif name == 'lda':
+        if np.any(L == 0):
+            print('Bcl_lda: There is no class {0} in the data.'.format(np.where(L == 0)[0][0] + dmin))
+            exit()
+        options['string'] = 'lda     '
+        options = _fit_lda(options, dmin, mc.T, np.sum(M2, axis=2), L)
+    elif name == 'qda':
+        options['string'] = 'qda     '
+        options = _fit_qda(options, dmin, mc.T, _covariances('Bcl_qda', L, M2, dmin), L)
+    else:
+        print('Bcl_finalize: classifier {0} can not be trained incrementally.'.format(name))
+        exit()
+
+    return options
+
+
+def _covariances(name, L, M2, dmin):
+    # covariance of each class, it requires two samples at least
+    if np.any(L < 2):
+        print('{0}: class {1} has less than 2 samples.'.format(name, np.where(L < 2)[0][0] + dmin))
+        exit()
+    return M2 / (L[:, 0] - 1)
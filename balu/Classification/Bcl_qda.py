@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 from .Bcl_construct import Bcl_construct
-from .Bcl_outscore import Bcl_outscore
+from .Bcl_outscore import Bcl_outscore, _param, _gap
+from .Bcl_dtype import _dtype
 
 
 def Bcl_qda(*args):
@@ -26,6 +27,15 @@ def Bcl_qda(*args):
            ds is the classification on test data
            options['dmin'] contains min(d).
            options['Ck'] is covariance matrix of each class.
+           options['Ck1'] is the pseudo-inverse of Ck for each class.
+           options['logdet'] is log(det(Ck)) of each class (computed with slogdet).
+           options['chunk'] number of test samples processed at once (default 4096).
+           options['dtype'] = 'float32' or 'float64' is the type of the
+           parameters and of the test computations (default: Bcl_dtype()).
+           options['output'] = 3 gives as score the sigmoid of the gap between
+           the two best discriminant functions, fitted in training to the
+           correct decisions on the design data (options['param'], see
+           Bft_sigmoid and Bcl_outscore).
            optionsmc contains the centroids of each class.
            options.string is a 8 character string that describes the performed
            classification (in this case 'qda     ').
@@ -81,24 +91,14 @@ def Bcl_qda(*args):
     if len(d.shape) < 2:
         d = np.expand_dims(d, axis=1)
 
-    options = options.copy()
-
-    options['string'] = 'qda     '
     if train:
+        options = options.copy()
+        options['string'] = 'qda     '
         dmin = d.min()
         dmax = d.max()
         d = d - dmin + 1
-        N = d.shape[0]               # number of samples
         K = int(dmax - dmin + 1)     # number of classes
 
-        options['p'] = np.array(options['p'])
-        pest = options['p'].size == 0
-
-        if pest:
-            p = np.zeros(K)
-        else:
-            p = options['p']
-
         m = X.shape[1]
         L = np.zeros((int(K), 1))
 
@@ -111,33 +111,88 @@ def Bcl_qda(*args):
 
             L[k] = ii.size                          # number of samples in class k
             Xk = X[ii, :]                           # samples of class k
-            mc[:, k] = np.mean(Xk, axis=0)          # mean of class k
+            mc[:, k] = np.mean(Xk, axis=0, dtype=np.float64)  # mean of class k
             Ck[:, :, k] = np.cov(Xk, rowvar=False)  # covariance of class k
-            if pest:
-                p[k] = L[k] / float(N)
 
-        options['dmin'] = dmin
-        options['mc'] = mc
-        options['Ck'] = Ck
-        options['p'] = p
+        options = _fit(options, dmin, mc, Ck, L)
+        options = _param(options, _scores, X, d)
         output = options
 
     if test:
         K = options['mc'].shape[1]
         Nt = Xt.shape[0]
-        D = np.zeros((Nt, K))
-        for k in range(K):
-            C = options['Ck'][:, :, k]
-            Xd = (Xt - np.dot(np.ones((Nt, 1)), options['mc'][:, k][:, np.newaxis].T))
-            C1 = np.diag(-0.5 * np.dot(np.dot(Xd, np.linalg.pinv(C)), Xd.T))[:, np.newaxis]
-            C2 = (-0.5 * np.log(np.linalg.det(C)) + np.log(options['p'][k])) * np.ones((Nt, 1))
-            D[:, k] = np.squeeze(C1 + C2)
+        D = np.zeros((Nt, K), options['mc'].dtype)
+        chunk = options['chunk'] if 'chunk' in options else 4096
+        op = _prepare(options)
+
+        for q in range(0, Nt, chunk):
+            D[q:q + chunk, :] = _scores(op, Xt[q:q + chunk, :])
 
         i = np.max(D, axis=1)
         j = np.argmax(D, axis=1)
         sc = np.ones(i.shape) / (np.abs(i) + 1e-5)
+        if 'output' in options and options['output'] == 3:
+            sc = _gap(D)
         ds = j + options['dmin']
         ds = Bcl_outscore(ds, sc, options)
         output = ds, options
 
     return output
+
+
+def _fit(options, dmin, mc, Ck, L):
+    # options of a trained classifier from the centroids (mc), covariances (Ck)
+    # and number of samples (L) of the classes (see Bcl_finalize)
+    options['p'] = np.array(options['p'])
+    if options['p'].size == 0:
+        p = L[:, 0] / float(L.sum())
+    else:
+        p = options['p']
+
+    dt = _dtype(options)
+    options['dmin'] = dmin
+    options['mc'] = mc.astype(dt)
+    options['Ck'] = Ck
+    Ck1, options['logdet'] = _inverse(Ck)
+    options['Ck1'] = Ck1.astype(dt)
+    options['p'] = p
+    return options
+
+
+def _prepare(options):
+    # options with the inverse covariances (computed once for the models
+    # trained without them)
+    if 'Ck1' in options:
+        return options
+    Ck1, logdet = _inverse(options['Ck'])
+    return dict(options, Ck1=Ck1, logdet=logdet)
+
+
+def _scores(options, x):
+    # quadratic discriminant functions of the classes for the rows of x
+    if 'Ck1' in options:
+        Ck1, logdet = options['Ck1'], options['logdet']
+    else:
+        Ck1, logdet = _inverse(options['Ck'])
+    K = Ck1.shape[2]
+    x = np.asarray(x, dtype=Ck1.dtype)
+    D = np.zeros((x.shape[0], K), Ck1.dtype)
+    for k in range(K):
+        Xd = x - options['mc'][:, k]
+        C1 = -0.5 * np.einsum('ij,ij->i', np.dot(Xd, Ck1[:, :, k]), Xd)
+        C2 = float(-0.5 * logdet[k] + np.log(options['p'][k]))
+        D[:, k] = C1 + C2
+    return D
+
+
+def _inverse(Ck):
+    # pseudo-inverse and log-determinant of the covariance of each class
+    m, _, K = Ck.shape
+    Ck1 = np.zeros((m, m, K))
+    logdet = np.zeros(K)
+    for k in range(K):
+        Ck1[:, :, k] = np.linalg.pinv(Ck[:, :, k])
+        sign, logdet[k] = np.linalg.slogdet(Ck[:, :, k])
+        if sign == 0:
+            logdet[k] = -np.inf
+    return Ck1, logdet
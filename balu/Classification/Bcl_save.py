@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import pickle
+import sys
+import importlib
+import numpy as np
+
+# functions and classes that a saved model can use (see Bcl_load and _trusted)
+_allowed = {}
+
+
+def Bcl_save(path, options):
+    """ Bcl_save(path, options)
+
+     Toolbox: Balu
+        Saves a trained classifier (the options returned by a Bcl_ classifier
+        or the structure returned by Bcl_structure) in directory path.
+
+        Every NumPy array of the model, including the arrays inside the
+        scikit-learn objects (KDTree, SVC, MLPClassifier...), is written to
+        an uncompressed .npy file, and the rest of the model is described in
+        path/manifest.json. Objects that can not be described this way are
+        pickled in a .pkl file. Bcl_load can memory-map the arrays, thus a
+        model is loaded without reading its training data into memory. Models
+        with other objects than the ones of the Balu classifiers can be saved
+        but not loaded (see Bcl_load).
+
+     Example:
+        from balu.ImagesAndData import balu_load
+        from balu.Classification import Bcl_knn, Bcl_save, Bcl_load
+
+        data = balu_load('datagauss')
+        op = Bcl_knn(data['X'], data['d'], {'k': 5})
+        Bcl_save('knn_model', op)
+        op2 = Bcl_load('knn_model')                  # memory-mapped
+        ds, _ = Bcl_knn(data['Xt'], op2)
+
+     See also Bcl_load, Bcl_structure.
+    """
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    files = []
+    root = _encode(options, path, files)
+    manifest = {'format': 'balu-model', 'version': 1, 'files': files, 'model': root}
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+
+def Bcl_load(path, mmap=True):
+    """ options = Bcl_load(path, mmap)
+
+     Toolbox: Balu
+        Loads a classifier saved with Bcl_save in directory path. With mmap=True
+        (default) the arrays are memory-mapped (read only), they are read from
+        disk when they are used.
+
+        Warning: loading a model calls the functions and classes named in
+        path/manifest.json and unpickles its .pkl files, as pickle.load does.
+        Only load models from trusted sources. The functions and classes are
+        restricted to the ones that the Balu classifiers need: the NumPy
+        array, dtype and random state reconstructors, the scikit-learn KDTree,
+        BallTree, SVC, LinearSVC, SGDClassifier, MLPClassifier (with its
+        optimizers and label binarizer) and a few Python builtins (set,
+        complex, slice...). The model is not loaded if it names any other
+        one.
+
+     See also Bcl_save.
+    """
+
+    with open(os.path.join(path, 'manifest.json'), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != 'balu-model':
+        print('Bcl_load: {0} is not a Balu model.'.format(path))
+        exit()
+    return _decode(manifest['model'], path, 'r' if mmap else None)
+
+
+def _encode(x, path, files):
+    # JSON description of x, the arrays are written to .npy files in path
+    if x is None or isinstance(x, (bool, int, float, str)):
+        return x
+    if isinstance(x, np.ndarray) and x.dtype != object:
+        name = 'a{0}.npy'.format(len(files))
+        np.save(os.path.join(path, name), np.ascontiguousarray(x) if not x.flags.f_contiguous else x)
+        files.append(name)
+        return {'__npy__': name}
+    if isinstance(x, np.generic) and not isinstance(x, np.object_):
+        return {'__scalar__': x.item(), 'dtype': x.dtype.str}
+    if isinstance(x, dict) and all(isinstance(k, str) for k in x):
+        return {'__dict__': dict((k, _encode(v, path, files)) for k, v in x.items())}
+    if type(x) in (list, tuple):
+        return {'__list__' if isinstance(x, list) else '__tuple__': [_encode(v, path, files) for v in x]}
+
+    try:
+        if isinstance(x, type):
+            # classes (and the functions below) are saved by name
+            return {'__global__': _name(x)}
+        # objects are described as pickle does: f(*args) and its state
+        r = x.__reduce_ex__(2)
+        if not isinstance(r, tuple):
+            raise TypeError
+        s = {'__object__': _name(r[0]), 'args': _encode(tuple(r[1]), path, files)}
+        if len(r) > 2 and r[2] is not None:
+            s['state'] = _encode(r[2], path, files)
+        if len(r) > 3 and r[3] is not None:
+            s['items'] = _encode(list(r[3]), path, files)
+        if len(r) > 4 and r[4] is not None:
+            s['dictitems'] = _encode([list(kv) for kv in r[4]], path, files)
+        return s
+    except Exception:
+        name = 'o{0}.pkl'.format(len(files))
+        with open(os.path.join(path, name), 'wb') as f:
+            pickle.dump(x, f, protocol=2)
+        files.append(name)
+        return {'__pickle__': name}
+
+
+def _name(f):
+    name = getattr(f, '__qualname__', f.__name__)
+    if _global([f.__module__, name]) is not f:
+        raise TypeError
+    return [f.__module__, name]
+
+
+def _global(name):
+    f = importlib.import_module(name[0])
+    for a in name[1].split('.'):
+        f = getattr(f, a)
+    return f
+
+
+def _decode(s, path, mmap_mode):
+    if not isinstance(s, dict):
+        return s
+    if '__npy__' in s:
+        return np.load(os.path.join(path, s['__npy__']), mmap_mode=mmap_mode)
+    if '__scalar__' in s:
+        return np.dtype(str(s['dtype'])).type(s['__scalar__'])
+    if '__dict__' in s:
+        return dict((str(k), _decode(v, path, mmap_mode)) for k, v in s['__dict__'].items())
+    if '__list__' in s:
+        return [_decode(v, path, mmap_mode) for v in s['__list__']]
+    if '__tuple__' in s:
+        return tuple(_decode(v, path, mmap_mode) for v in s['__tuple__'])
+    if '__pickle__' in s:
+        with open(os.path.join(path, s['__pickle__']), 'rb') as f:
+            return _Unpickler(f).load()
+
+    if '__global__' in s:
+        return _trusted(s['__global__'])
+
+    x = _trusted(s['__object__'])(*_decode(s['args'], path, mmap_mode))
+    if 'state' in s:
+        state = _decode(s['state'], path, mmap_mode)
+        if hasattr(x, '__setstate__'):
+            x.__setstate__(state)
+        else:
+            x.__dict__.update(state)
+    if 'items' in s:
+        for v in _decode(s['items'], path, mmap_mode):
+            x.append(v)
+    if 'dictitems' in s:
+        for k, v in _decode(s['dictitems'], path, mmap_mode):
+            x[k] = v
+    return x
+
+
+def _trusted(name):
+    # function or class name = [module, qualified name] if a model can use it
+    if not _allowed:
+        for f in _objects():
+            _allowed[(f.__module__, getattr(f, '__qualname__', f.__name__))] = f
+    name = (str(name[0]), str(name[1]))
+    if name not in _allowed:
+        print('Bcl_load: {0}.{1} is not allowed in a Balu model.'.format(name[0], name[1]))
+        exit()
+    return _allowed[name]
+
+
+def _objects():
+    # the functions and classes of the models of the Balu classifiers (and
+    # the reconstructors of their pickles)
+    import copyreg
+    import collections
+    from numpy.random import RandomState, MT19937, SeedSequence
+    from sklearn.neighbors import KDTree, BallTree
+    from sklearn.svm import SVC, LinearSVC
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import LabelBinarizer
+
+    f = [object, set, frozenset, complex, slice, bytearray, bytes, range, collections.OrderedDict,
+         copyreg._reconstructor, copyreg.__newobj__, copyreg.__newobj_ex__,
+         np.ndarray, np.dtype, np.zeros(0, object).__reduce__()[0],
+         RandomState, MT19937, SeedSequence,
+         KDTree, BallTree, SVC, LinearSVC, SGDClassifier, MLPClassifier, LabelBinarizer]
+    try:
+        from sklearn.metrics import DistanceMetric
+    except ImportError:
+        from sklearn.neighbors import DistanceMetric
+    f.append(type(DistanceMetric.get_metric('euclidean')))        # metric of the trees
+    names = [('numpy.random._pickle', '__randomstate_ctor'), ('numpy.random._pickle', '__bit_generator_ctor'),
+             ('numpy.random.bit_generator', '__pyx_unpickle_SeedSequence'),
+             (KDTree.__module__, 'newObj'), (BallTree.__module__, 'newObj'), (f[-1].__module__, 'newObj'),
+             (SGDClassifier.__module__, 'Hinge'),
+             (MLPClassifier.__module__, 'AdamOptimizer'), (MLPClassifier.__module__, 'SGDOptimizer')]
+    for module, name in names:
+        # private reconstructors (they depend on the versions of NumPy and scikit-learn)
+        try:
+            f.append(getattr(sys.modules[module] if module in sys.modules else importlib.import_module(module), name))
+        except (ImportError, AttributeError):
+            pass
+    return [g for g in f if hasattr(g, '__module__')]
+
+
+class _Unpickler(pickle.Unpickler):
+    # unpickler restricted to the functions and classes of _trusted
+
+    def find_class(self, module, name):
+        return _trusted([module, name])
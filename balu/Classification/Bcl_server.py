@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+import threading
+from collections import deque
+import numpy as np
+from .Bcl_structure import Bcl_structure
+from .Bcl_save import Bcl_load
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    import queue
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    import Queue as queue
+
+
+def Bcl_server(model, host='127.0.0.1', port=8000, max_batch=256, max_latency=0.005, serve=True):
+    """ server = Bcl_server(model, host, port, max_batch, max_latency, serve)
+
+     Toolbox: Balu
+        Prediction server (HTTP) of a trained Balu classifier structure.
+
+        model is the trained structure b (as returned by Bcl_structure in
+        training only mode) or the directory where it was saved with Bcl_save
+        (it is loaded once, memory-mapped). The server listens on host:port
+        (default 127.0.0.1:8000).
+
+        The concurrent requests are grouped in micro-batches of at most
+        max_batch rows (default 256): a batch is tested (one call to
+        Bcl_structure) when it is full or when its first request has waited
+        max_latency seconds (default 0.005).
+
+        Requests:
+           POST /predict   body {"X": [[x11, x12, ...], [x21, x22, ...]]} (one
+                           row per sample, or a single row [x1, x2, ...]), the
+                           answer is {"ds": [...]}, one row of ds per sample.
+           GET  /stats     counters: requests, rows, batches, errors, mean
+                           batch size, throughput (rows/s) and latency (s,
+                           mean, p50, p99 and max of the last 10000 requests).
+
+        With serve=False the server is returned without serving, call
+        server.serve_forever() (e.g. in a thread) and server.shutdown().
+
+        From the command line:
+           python -m balu.Classification.Bcl_server model_dir --port 8000
+
+     Example:
+        from balu.ImagesAndData import balu_load
+        from balu.Classification import Bcl_structure, Bcl_save, Bcl_server
+
+        data = balu_load('datagauss')
+        b = [{'name': 'knn', 'options': {'k': 5}}, {'name': 'lda', 'options': {'p': []}}]
+        Bcl_save('model', Bcl_structure(data['X'], data['d'], b))
+        Bcl_server('model', port=8000)
+
+        # client:
+        # curl -d '{"X": [[1.2, 3.4]]}' http://127.0.0.1:8000/predict
+        # curl http://127.0.0.1:8000/stats
+
+     See also Bcl_structure, Bcl_save, Bcl_batch.
+    """
+
+    if isinstance(model, str):
+        model = Bcl_load(model)
+
+    server = _Server((host, port), _Handler)
+    server.batcher = _Batcher(model, max_batch, max_latency)
+    if serve:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+    return server
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send(200, self.server.batcher.stats())
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/predict':
+            self._send(404, {'error': 'not found'})
+            return
+        try:
+            n = int(self.headers.get('Content-Length', 0))
+            X = np.asarray(json.loads(self.rfile.read(n).decode('utf-8'))['X'], dtype=float)
+            if X.ndim == 1:
+                X = X[np.newaxis, :]
+            if X.ndim != 2 or X.shape[0] == 0:
+                raise ValueError('X must be a matrix with one row per sample')
+        except Exception as e:
+            self._send(400, {'error': '{0}: {1}'.format(type(e).__name__, e)})
+            return
+
+        ds, error = self.server.batcher.predict(X)
+        if error is None:
+            self._send(200, {'ds': ds.tolist()})
+        else:
+            self._send(500, {'error': error})
+
+    def _send(self, code, body):
+        s = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(s)))
+        self.end_headers()
+        self.wfile.write(s)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Request(object):
+
+    def __init__(self, X):
+        self.X = X
+        self.t0 = time.time()
+        self.done = threading.Event()
+        self.ds = None
+        self.error = None
+
+
+class _Batcher(object):
+    # the requests are queued, a worker thread tests them in micro-batches
+
+    def __init__(self, model, max_batch, max_latency):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.start = time.time()
+        self.latency = deque(maxlen=10000)
+        self.count = {'requests': 0, 'rows': 0, 'batches': 0, 'errors': 0}
+        worker = threading.Thread(target=self._work)
+        worker.daemon = True
+        worker.start()
+
+    def predict(self, X):
+        r = _Request(X)
+        self.queue.put(r)
+        r.done.wait()
+        return r.ds, r.error
+
+    def stats(self):
+        with self.lock:
+            s = dict(self.count)
+            t = np.array(self.latency)
+        s['uptime'] = time.time() - self.start
+        s['throughput'] = s['rows'] / s['uptime']
+        s['batch_mean'] = s['rows'] / float(max(s['batches'], 1))
+        s['max_batch'] = self.max_batch
+        s['max_latency'] = self.max_latency
+        if t.size > 0:
+            s['latency'] = {'mean': float(np.mean(t)), 'p50': float(np.percentile(t, 50)),
+                            'p99': float(np.percentile(t, 99)), 'max': float(np.max(t))}
+        return s
+
+    def _work(self):
+        while True:
+            r = self.queue.get()
+            batch = [r]
+            n = r.X.shape[0]
+            deadline = r.t0 + self.max_latency
+            while n < self.max_batch:
+                t = deadline - time.time()
+                try:
+                    r = self.queue.get(timeout=t) if t > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(r)
+                n += r.X.shape[0]
+
+            # requests with different number of features are tested apart
+            groups = {}
+            for r in batch:
+                groups.setdefault(r.X.shape[1], []).append(r)
+            for g in groups.values():
+                self._test(g)
+
+    def _test(self, batch):
+        X = np.vstack([r.X for r in batch])
+        try:
+            ds = Bcl_structure(X, self.model)[0]
+            error = None
+        except (Exception, SystemExit) as e:
+            ds = None
+            error = '{0}: {1}'.format(type(e).__name__, e)
+
+        t = time.time()
+        q = 0
+        for r in batch:
+            n = r.X.shape[0]
+            if error is None:
+                r.ds = ds[q:q + n]
+            r.error = error
+            q += n
+            r.done.set()
+
+        with self.lock:
+            self.count['requests'] += len(batch)
+            self.count['rows'] += X.shape[0]
+            self.count['batches'] += 1
+            if error is not None:
+                self.count['errors'] += len(batch)
+            self.latency.extend([t - r.t0 for r in batch])
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Prediction server of a Balu classifier saved with Bcl_save.')
+    parser.add_argument('model', help='directory of the model (Bcl_save)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-latency', type=float, default=0.005, help='seconds')
+    a = parser.parse_args()
+    print('Bcl_server: {0} on http://{1}:{2}'.format(a.model, a.host, a.port))
+    Bcl_server(a.model, a.host, a.port, a.max_batch, a.max_latency)
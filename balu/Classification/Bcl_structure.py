@@ -1,13 +1,21 @@
 # -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
 import numpy as np
-import copy
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
 from .Bcl_construct import Bcl_construct
 
+_registry = {}      # classifier name -> function, built once (see _classifier)
+_pools = {}         # (backend, n_jobs) -> pool of workers, reused by all the calls (see _pool)
 
-def Bcl_structure(*args):
+
+def Bcl_structure(*args, **kwargs):
     """ ds = Bcl_structure(X, d, Xt, options)  Training & Testing together
      options = Bcl_structure(X, d, options)     Training only
      ds = Bcl_structure(Xt, options)      Testing only
+     ds = Bcl_structure(..., n_jobs=4, backend='thread')
 
      Toolbox: Balu
         Classification using Balu classifier(s) defined in structure b.
@@ -24,9 +32,23 @@ def Bcl_structure(*args):
         Test data:
            Xt is a matrix with features (columns)
 
+        Parallel execution:
+           n_jobs  = number of classifiers trained or tested at the same time
+                     (default 1, -1 means all the cores).
+           backend = 'thread' (default) or 'process' (training only, the
+                     testing uses threads). With 'process' the data is written
+                     once to memory-mapped files that all the workers map, the
+                     workers receive only the names of the files and the
+                     options of the classifiers. The pools of workers are
+                     created once and reused by the next calls.
+
         Output:
            ds is the classification on test data (one column per classifier)
 
+           The trained structure is not copied in testing (the classifiers do
+           not modify their options when testing), it is shared by all the
+           calls and it should not be modified.
+
         Example: Training & Test together:
             from balu.ImagesAndData import balu_load
             from balu.Classification import Bcl_structure
@@ -46,7 +68,7 @@ def Bcl_structure(*args):
                 {'name': 'lda',  'options': {'p': [] }},         # LDA
                 {'name': 'qda',  'options': {'p': [] }},         # QDA
                 {'name': 'nn' ,  'options': {'method': 2}},      # Neural Network
-                {'name': 'svm',  'options': {'kernel': 3}},      # rbf-SVM
+                {'name': 'svm',  'options': {'kernel': 2}},      # rbf-SVM
                 {'name': 'maha', 'options': {}},                 # Mahalanobis distance
                 {'name': 'dmin', 'options': {}},                 # Euclidean distance
             ]
@@ -73,7 +95,7 @@ def Bcl_structure(*args):
                 {'name': 'lda',  'options': {'p': [] }},         # LDA
                 {'name': 'qda',  'options': {'p': [] }},         # QDA
                 {'name': 'nn' ,  'options': {'method': 2}},      # Neural Network
-                {'name': 'svm',  'options': {'kernel': 3}},      # rbf-SVM
+                {'name': 'svm',  'options': {'kernel': 2}},      # rbf-SVM
                 {'name': 'maha', 'options': {}},                 # Mahalanobis distance
                 {'name': 'dmin', 'options': {}},                 # Euclidean distance
             ]
@@ -84,6 +106,9 @@ def Bcl_structure(*args):
             ds, _ = Bcl_structure(Xt, struct)                    # Testing only
             p = Bev_performance(ds, dt)
 
+        Example: The 9 classifiers trained and tested in parallel
+            ds, struct = Bcl_structure(X, d, Xt, op, n_jobs=-1, backend='process')
+
         See also Bcl_exe.
 
      D.Mery, PUC-DCC, Jul 2009
@@ -93,22 +118,24 @@ def Bcl_structure(*args):
      Diego Patiño (dapatinoco@unal.edu.co) -> Translated implementation into python (2016)
     """
     train, test, X, d, Xt, options = Bcl_construct(args)
-    options = copy.deepcopy(options)
 
     b = options
     if not isinstance(b, list):
         b = [b]
 
     n = len(b)                      # number of classifiers
+    n_jobs = kwargs['n_jobs'] if 'n_jobs' in kwargs else 1
+    backend = kwargs['backend'] if 'backend' in kwargs else 'thread'
+    if n_jobs < 0:
+        n_jobs = cpu_count()
+    n_jobs = min(n_jobs, n)
 
     if train:
+        b = [bi.copy() for bi in b]
+        tasks = [(b[i]['name'], b[i]['options']) for i in range(n)]
+        res = _run(_fit, tasks, n_jobs, backend, (X, d))
         for i in range(n):
-            Bn = b[i]['name']
-            if Bn[0] != 'B':
-                Bn = 'Bcl_' + Bn
-
-            cl = getattr(__import__('balu').Classification, Bn)
-            b[i]['options'] = cl(X, d, b[i]['options'])
+            b[i]['options'] = res[i]
 
         options = b
         output = options
@@ -117,13 +144,10 @@ def Bcl_structure(*args):
         nt = Xt.shape[0]
         ds3 = np.zeros((nt, n, 2))
         d3 = 0
+        tasks = [(b[i]['name'], b[i]['options']) for i in range(n)]
+        res = _run(_predict, tasks, n_jobs, backend, (Xt,))
         for i in range(n):
-            Bn = b[i]['name']
-            if Bn[1] != 'B':
-                Bn = 'Bcl_' + Bn
-
-            cl = getattr(__import__('balu').Classification, Bn)
-            dsi, _ = cl(Xt, b[i]['options'])
+            dsi = res[i]
 
             if len(dsi.shape) > 1:
                 ds3[:, i, 0] = dsi[:, 0]
@@ -141,3 +165,78 @@ def Bcl_structure(*args):
         output = ds, options
 
     return output
+
+
+def _classifier(name):
+    if len(_registry) == 0:
+        cl = __import__('balu').Classification
+        for s in dir(cl):
+            if s.startswith('Bcl_'):
+                _registry[s] = getattr(cl, s)
+
+    if name[0] != 'B':
+        name = 'Bcl_' + name
+    if name not in _registry:
+        print('Bcl_structure: classifier {0} does not exist.'.format(name))
+        exit()
+    return _registry[name]
+
+
+def _call(task):
+    # task of a process worker, the arrays of the data are memory-mapped
+    f, shared, t = task
+    data = tuple(np.memmap(x[1], dtype=x[3], mode='c', shape=x[2]).view(np.ndarray)
+                 if isinstance(x, tuple) and len(x) == 4 and x[0] == '__memmap__' else x for x in shared)
+    return f(data, t)
+
+
+def _share(data, path):
+    # the arrays of data written to memory-mapped files in path, the workers
+    # receive (name of the file, shape, dtype) instead of the array
+    shared = []
+    for i in range(len(data)):
+        x = data[i]
+        if isinstance(x, np.ndarray) and x.dtype != object and x.size > 0:
+            name = os.path.join(path, 'a{0}.dat'.format(i))
+            m = np.memmap(name, dtype=x.dtype, mode='w+', shape=x.shape)
+            m[...] = x
+            m.flush()
+            del m
+            x = ('__memmap__', name, x.shape, x.dtype.str)
+        shared.append(x)
+    return tuple(shared)
+
+
+def _fit(data, task):
+    X, d = data
+    return _classifier(task[0])(X, d, task[1])
+
+
+def _predict(data, task):
+    ds = np.asarray(_classifier(task[0])(data[0], task[1])[0])
+    if ds.ndim == 1 and ds.size == 2 * data[0].shape[0]:
+        ds = ds.reshape(2, -1).T            # output 2 or 3 (see Bcl_outscore): class and score
+    return ds
+
+
+def _pool(n_jobs, backend):
+    key = (backend, n_jobs)
+    if key not in _pools:
+        _pools[key] = Pool(n_jobs) if backend == 'process' else ThreadPool(n_jobs)
+    return _pools[key]
+
+
+def _run(f, tasks, n_jobs, backend, data):
+    # f(data, task) for each task, in a pool of n_jobs workers
+    if n_jobs <= 1:
+        return [f(data, t) for t in tasks]
+
+    if backend != 'process' or f is _predict:
+        return _pool(n_jobs, 'thread').map(lambda t: f(data, t), tasks, chunksize=1)
+
+    path = tempfile.mkdtemp(prefix='balu_')
+    try:
+        shared = _share(data, path)
+        return _pool(n_jobs, 'process').map(_call, [(f, shared, t) for t in tasks], chunksize=1)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 from .Bcl_construct import Bcl_construct
-from sklearn import svm
+from sklearn import svm, linear_model
 
 
 def Bcl_svm(*args):
@@ -25,13 +25,36 @@ def Bcl_svm(*args):
 
            kernel can be either int or string.
 
+           options['cache_size'] size of the kernel cache in MB (default 200).
+           options['C'] penalty parameter (default 1).
+           options['solver'] defines the training algorithm:
+              'libsvm'   : SVC of scikit-learn, O(N^2) or worse in memory and time.
+              'liblinear': primal linear SVM (LinearSVC of scikit-learn, squared
+                           hinge loss), linear kernel only.
+              'sgd'      : linear SVM trained by stochastic gradient descent
+                           (SGDClassifier of scikit-learn), linear kernel only.
+              'auto'     : 'liblinear' for the linear kernel with more than 10000
+                           samples, 'libsvm' otherwise (default).
+           options['approx'] approximation of the rbf kernel for large training
+           sets: X is mapped to options['n_components'] features (default 500)
+           and a linear SVM is trained on them (solver 'liblinear' or 'sgd').
+              'rff'      : random Fourier features (Rahimi & Recht, 2007).
+              'nystroem' : Nystroem approximation with n_components samples
+                           of X as landmarks (Williams & Seeger, 2001).
+           options['gamma'] parameter of the rbf kernel exp(-gamma*|x-y|^2),
+           also used by the 'poly' and 'sigmoid' kernels (default 1 / (number
+           of features * variance of X), as 'scale' in scikit-learn), for the
+           exact and the approximated kernel.
+
         Test data:
            Xt is a matrix with features (columns)
 
         Output:
            ds is the classification on test data
            options['svmStruct'] contains information about the trained classifier
-           (from SVC class of scikit-learn).
+           (from SVC, LinearSVC or SGDClassifier class of scikit-learn).
+           options['fmap'] is the feature map of the approximated kernel, the
+           test data is mapped with a matrix product before the linear SVM.
            options.string is a 8 character string that describes the performed
            classification (e.g., 'svm,4  ' means rbf-SVM).
 
@@ -69,6 +92,14 @@ def Bcl_svm(*args):
             ds, _ = Bcl_svm(Xt, op)                 # rbf-SVM classifier testing
             p = Bev_performance(ds, dt)             # performance on test data
 
+        Example: Linear SVM on a large training set
+            op = {'kernel': 'linear', 'solver': 'sgd'}
+            op = Bcl_svm(X, d, op)
+
+        Example: Approximated rbf-SVM on a large training set
+            op = {'kernel': 'rbf', 'approx': 'rff', 'n_components': 1000}
+            op = Bcl_svm(X, d, op)
+
 
      D.Mery, PUC-DCC, 2010
      http://dmery.ing.puc.cl
@@ -82,11 +113,9 @@ def Bcl_svm(*args):
     if len(d.shape) < 2:
         d = np.expand_dims(d, axis=1)
 
-    options = options.copy()
-
-    options['string'] = 'svm,{0}   '.format(options['kernel'])
-
     if train:
+        options = options.copy()
+        options['string'] = 'svm,{0}   '.format(options['kernel'])
 
         all_kernels = ['linear', 'poly', 'rbf', 'sigmoid']
         k = 'rbf'
@@ -97,14 +126,79 @@ def Bcl_svm(*args):
         elif c in all_kernels:
             k = c
 
-        clf = svm.SVC()
+        solver = options['solver'] if 'solver' in options else 'auto'
+        C = options['C'] if 'C' in options else 1.0
+        if 'approx' in options:
+            if k != 'rbf':
+                print('Bcl_svm: the approximation requires the rbf kernel.')
+                exit()
+            options['fmap'] = _fmap_fit(X, options)
+            X = _fmap(options['fmap'], X)
+            k = 'linear'
+            if solver == 'auto':
+                solver = 'liblinear'
+        if solver == 'auto':
+            solver = 'liblinear' if k == 'linear' and X.shape[0] > 10000 else 'libsvm'
+        if solver != 'libsvm' and k != 'linear':
+            print('Bcl_svm: solver {0} requires a linear kernel.'.format(solver))
+            exit()
+
+        if solver == 'liblinear':
+            clf = svm.LinearSVC(C=C, dual=X.shape[0] < X.shape[1])
+        elif solver == 'sgd':
+            clf = linear_model.SGDClassifier(loss='hinge', alpha=1.0 / (C * X.shape[0]))
+        else:
+            cache_size = options['cache_size'] if 'cache_size' in options else 200
+            gamma = options['gamma'] if 'gamma' in options else _gamma(X)
+            clf = svm.SVC(C=C, kernel=k, gamma=gamma, cache_size=cache_size)
         clf.fit(X, np.squeeze(d))
         options['svmStruct'] = clf
         output = options
 
     if test:
         clf = options['svmStruct']
+        if 'fmap' in options:
+            Xt = _fmap(options['fmap'], Xt)
         ds = clf.predict(Xt)[:, np.newaxis]
         output = ds, options
 
     return output
+
+
+def _gamma(X):
+    # default gamma of the kernel ('scale' of scikit-learn)
+    v = X.var()
+    return 1.0 / (X.shape[1] * v) if v > 0 else 1.0
+
+
+def _fmap_fit(X, options):
+    # random feature map of the rbf kernel exp(-gamma*|x-y|^2)
+    N, m = X.shape
+    D = options['n_components'] if 'n_components' in options else 500
+    gamma = options['gamma'] if 'gamma' in options else _gamma(X)
+    rs = np.random.RandomState(0)
+    if options['approx'] == 'rff':
+        W = rs.normal(0, np.sqrt(2 * gamma), (m, D))
+        b = rs.uniform(0, 2 * np.pi, D)
+        return {'approx': 'rff', 'W': W, 'b': b}
+    elif options['approx'] == 'nystroem':
+        Xc = X[rs.choice(N, min(D, N), replace=False)]
+        s, V = np.linalg.eigh(_rbf(Xc, Xc, gamma))
+        t = s > 1e-12 * s.max()
+        M = np.dot(V[:, t] / np.sqrt(s[t]), V[:, t].T)           # K^(-1/2)
+        return {'approx': 'nystroem', 'Xc': Xc, 'M': M, 'gamma': gamma}
+    else:
+        print('Bcl_svm: approximation {0} does not exist.'.format(options['approx']))
+        exit()
+
+
+def _fmap(fmap, X):
+    if fmap['approx'] == 'rff':
+        D = fmap['b'].size
+        return np.sqrt(2.0 / D) * np.cos(np.dot(X, fmap['W']) + fmap['b'])
+    return np.dot(_rbf(X, fmap['Xc'], fmap['gamma']), fmap['M'])
+
+
+def _rbf(X, Y, gamma):
+    e = np.sum(X ** 2, axis=1)[:, np.newaxis] - 2 * np.dot(X, Y.T) + np.sum(Y ** 2, axis=1)
+    return np.exp(-gamma * np.maximum(e, 0))
@@ -3,11 +3,21 @@ from .Bcl_construct import Bcl_construct
 from .Bcl_outscore import Bcl_outscore
 from .Bcl_structure import Bcl_structure
 from .Bcl_knn import Bcl_knn
+from .Bcl_knnindex import Bcl_knnindex, Bcl_knnquery
+from .Bcl_knnreduce import Bcl_knnreduce
 from .Bcl_maha import Bcl_maha
 from .Bcl_qda import Bcl_qda
 from .Bcl_dmin import Bcl_dmin
 from .Bcl_svm import Bcl_svm
 from .Bcl_nn import Bcl_nn
+from .Bcl_partialfit import Bcl_partialfit, Bcl_finalize
+from .Bcl_batch import Bcl_batch
+from .Bcl_save import Bcl_save, Bcl_load
+from .Bcl_server import Bcl_server
+from .Bcl_ensemble import Bcl_ensemble
+from .Bcl_dtype import Bcl_dtype
+from .Bcl_cascade import Bcl_cascade
 
-__all__ = ['Bcl_lda', 'Bcl_construct', 'Bcl_outscore', 'Bcl_lda', 'Bcl_structure', 'Bcl_knn', 'Bcl_maha',
-           'Bcl_qda', 'Bcl_dmin', 'Bcl_svm', 'Bcl_nn']
+__all__ = ['Bcl_lda', 'Bcl_construct', 'Bcl_outscore', 'Bcl_lda', 'Bcl_structure', 'Bcl_knn', 'Bcl_knnindex', 'Bcl_knnquery', 'Bcl_knnreduce', 'Bcl_maha',
+           'Bcl_qda', 'Bcl_dmin', 'Bcl_svm', 'Bcl_nn', 'Bcl_partialfit', 'Bcl_finalize',
+           'Bcl_batch', 'Bcl_save', 'Bcl_load', 'Bcl_server', 'Bcl_ensemble', 'Bcl_dtype', 'Bcl_cascade']
@@ -13,6 +13,8 @@ def Bfx_basicgeo(R, *args):
      This function calls regionprops of Scikit image library.
 
      options['show'] = True display messages.
+     options['offset'] = (i0, j0) position of R[0, 0] in the original image,
+                         added to the center of gravity (default (0, 0)).
 
      X is the feature vector
      Xn is the list of feature names.
@@ -74,9 +76,11 @@ def Bfx_basicgeo(R, *args):
     dm = np.mean(TD[Ireg, Jreg])
     Gd = A / 9 / np.pi / dm ** 2
 
+    i0, j0 = options.get('offset', (0, 0))
+
     X = np.array([[
-        stats[0].centroid[0],
-        stats[0].centroid[1],
+        stats[0].centroid[0] + i0,
+        stats[0].centroid[1] + j0,
         height,
         width,
         A,
@@ -12,6 +12,8 @@ def Bfx_fitellipse(R, options=None):
         Fit ellipse for the boundary of a binary image R.
 
         options.show = 1 display mesagges.
+        options['offset'] = (i0, j0) position of R[0, 0] in the original
+        image (default (0, 0)).
 
         X is a 6 elements vector:
           X(1): Ellipse-centre i direction
@@ -51,7 +53,7 @@ def Bfx_fitellipse(R, options=None):
      Diego Patiño (dapatinoco@unal.edu.co) -> Translated implementation into python (2016)
     """
 
-    E = R - binary_erosion(R)
+    E = np.logical_xor(R, binary_erosion(R))
     Y, X = np.where(E == 1)                 # pixel of perimeter in (i,j)
     if X.size > 5:
 
@@ -61,6 +63,11 @@ def Bfx_fitellipse(R, options=None):
         if options['show']:
             print('--- extracting ellipse features...')
 
+        # coordinates in the original image
+        i0, j0 = options.get('offset', (0, 0))
+        X = X + j0
+        Y = Y + i0
+
         # normalize data
         mx = np.mean(X)
         my = np.mean(Y)
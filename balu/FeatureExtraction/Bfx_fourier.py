@@ -1,11 +1,16 @@
 import numpy as np
 from scipy.misc import imresize
+from balu.ImageProcessing import Bim_pyramidlevel, Bim_pyramidresize
 
 
 def Bfx_fourier(I, *args):
     '''
     % [X,Xn,Xu] = Xfourier(I,R,options)
     % [X,Xn,Xu] = Xfourier(I,options)
+    % [X,Xn,Xu] = Xfourier(P,options)
+    %
+    %    I can also be a pyramid P of the image (see Bim_pyramid). Without
+    %    R the Nfourier x Mfourier image is taken from (and kept in) P.
     %
     % Toolbox Xvis: Fourier features
     %
@@ -32,6 +37,14 @@ def Bfx_fourier(I, *args):
 
     assert len(args) > 0, "Please provide at least the 'options' argument"
 
+    P = None
+    if isinstance(I, dict):
+        P = I
+        I = Bim_pyramidlevel(P, 0)
+        if len(args) > 1:
+            I = I.copy()
+            P = None
+
     if len(args) == 1:
         R = np.ones(I.shape)
         options = args[0]
@@ -39,20 +52,24 @@ def Bfx_fourier(I, *args):
         R = args[0]
         options = args[1]
 
-    I[np.where(R == 0)] = 0
+    if P is None:
+        I[np.where(R == 0)] = 0
 
     N = options['Nfourier']
     M = options['Mfourier']
     n = options['nfourier']
     m = options['mfourier']
 
-    N2 = np.round(N / 2.0)
-    M2 = np.round(M / 2.0)
+    N2 = int(np.round(N / 2.0))
+    M2 = int(np.round(M / 2.0))
 
     if 'show' in options and options['show'] is True:
         print('--- extracting Fourier features...')
 
-    Im = imresize(I.astype(float), (N, M))
+    if P is None:
+        Im = imresize(I.astype(float), (N, M))
+    else:
+        Im = Bim_pyramidresize(P, (N, M))
     FIm = np.fft.fft2(Im)
     x = np.abs(FIm)
     F = imresize(x[0:N2, 0:M2], (n, m))
@@ -1,17 +1,21 @@
 # -*- coding: utf-8 -*-
 import numpy as np
+from balu.ImageProcessing import Bim_regionindex, Bim_regionwindow
 
 
 def Bfx_geo(R, options):
     """ X, Xn = Bfx_geo(R, options)
      X, Xn = Bfx_geo(L, options)
+     X, Xn = Bfx_geo(Ri, options)
 
      Toolbox: Balu
 
         Gemteric feature extraction.
 
         This function calls gemetric feature extraction procedures of binary
-        image R or labelled image L.
+        image R, labelled image L or region index Ri of L (see
+        Bim_regionindex). Each region is processed in a window around its
+        bounding box, so the image is not scanned once per region.
 
         X is the feature matrix (one feature per column, one sample per row),
         Xn is the list with the names of these features (see Example
@@ -57,7 +61,11 @@ def Bfx_geo(R, options):
             figure(); imshow(K, cmap='gray'); title('abs(orientation)<15 grad')
             show()
 
-       See also Bfx_basicgeo, Bfx_hugeo, Bfx_flusser, Bfx_gupta,
+       Example 3: Reuse the region index of the segmentation
+            F, m, Ri = Bim_segmowgli(I, None, 40, 1.5, index=True)
+            X, Xn = Bfx_geo(Ri, options)
+
+       See also Bim_regionindex, Bfx_basicgeo, Bfx_hugeo, Bfx_flusser, Bfx_gupta,
                 Bfx_fitellipse, Bfx_fourierdes, Bfx_files.
 
      (c) D.Mery, PUC-DCC, 2010
@@ -66,16 +74,23 @@ def Bfx_geo(R, options):
      With collaboration from:
      Diego Patiño (dapatinoco@unal.edu.co) -> Translated implementation into python (2016)
     """
-    if R.size == 0:
+    if not isinstance(R, dict) and R.size == 0:
         print('Bfx_geo: R is empty. Geometric features without segmentation has no sense.')
         exit()
     else:
+        if isinstance(R, dict):
+            Ri = R
+        else:
+            Ri = Bim_regionindex(R.astype(int))
         b = options['b']
         n = len(b)
-        m = int(R.max())
+        m = Ri['n']
         X = np.array([])
         for j in range(1, m + 1):
-            Rj = R==j
+            if Ri['area'][j - 1] > 0:
+                Rj, i0, j0 = Bim_regionwindow(Ri, j)
+            else:
+                Rj, i0, j0 = np.zeros(Ri['shape'], bool), 0, 0
             Xj = np.array([])
             Xnj = []
             for i in range(n):
@@ -89,7 +104,9 @@ def Bfx_geo(R, options):
                     exit()
 
                 f = getattr(balu_module.FeatureExtraction, s)
-                Xi, Xni = f(Rj, b[i]['options'])
+                opt = dict(b[i]['options'] or {})
+                opt['offset'] = (i0, j0)
+                Xi, Xni = f(Rj, opt)
                 Xj = np.hstack((Xj, np.squeeze(Xi)))
                 Xnj += Xni
 
@@ -1,11 +1,8 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 from skimage.feature import local_binary_pattern
-from balu.ImageProcessing import Bim_inthist
-from scipy.signal import convolve2d, order_filter
+from balu.ImageProcessing import Bim_inthist, Bim_conv2, Bim_ordfilt2
 from skimage.util.shape import view_as_blocks
-from skimage.filters import median
-from skimage.morphology import square
 
 
 def Bfx_lbp(I, R=None, options={}):
@@ -186,26 +183,26 @@ def Bfx_lbp(I, R=None, options={}):
 
         weight = options['weight']
         if weight == 1:
-            W = np.abs(convolve2d(Id, np.ones((mt, mt)) / mt2, mode='same') - Id)
+            W = np.abs(Bim_conv2(Id, np.ones((mt, mt)) / mt2) - Id)
         elif weight == 2:
-            W = (np.abs(convolve2d(Id, np.ones((mt, mt)) / mt2, mode='same') - Id)) / (Id + 1)
+            W = (np.abs(Bim_conv2(Id, np.ones((mt, mt)) / mt2) - Id)) / (Id + 1)
         elif weight == 3:
-            W = np.abs(median(Id, square(mt)) - Id)
+            W = np.abs(Bim_ordfilt2(Id, 'median', mt, 'nearest') - Id)
         elif weight == 4:
-            W = np.abs(median(Id, square(mt)) - Id) / (Id + 1)
+            W = np.abs(Bim_ordfilt2(Id, 'median', mt, 'nearest') - Id) / (Id + 1)
         elif weight == 5:
-            W = np.abs(order_filter(Id, np.ones((mt, mt)), 0) - Id)
+            W = np.abs(Bim_ordfilt2(Id, 0, mt) - Id)
         elif weight == 6:
-            W = np.abs(order_filter(Id, np.ones((mt, mt)), 0) - Id) / (Id + 1)
+            W = np.abs(Bim_ordfilt2(Id, 0, mt) - Id) / (Id + 1)
         elif weight == 7:
-            Id = convolve2d(Id, np.ones((mt, mt)) / mt2, mode='same')
-            W = np.abs(order_filter(Id, np.ones((mt, mt)), 0) - Id) / (Id + 1)
+            Id = Bim_conv2(Id, np.ones((mt, mt)) / mt2)
+            W = np.abs(Bim_ordfilt2(Id, 0, mt) - Id) / (Id + 1)
         elif weight == 8:
-            Id = median(Id, square(mt))
-            W = np.abs(order_filter(Id, np.ones((mt, mt)), 0) - Id) / (Id + 1)
+            Id = Bim_ordfilt2(Id, 'median', mt, 'nearest')
+            W = np.abs(Bim_ordfilt2(Id, 0, mt) - Id) / (Id + 1)
         elif weight == 9:
-            Id = median(Id, square(mt))
-            W = np.abs(order_filter(Id, np.ones((mt, mt)), 1) - Id) / (Id + 1)
+            Id = Bim_ordfilt2(Id, 'median', mt, 'nearest')
+            W = np.abs(Bim_ordfilt2(Id, 1, mt) - Id) / (Id + 1)
         else:
             print("Bfx_lbp does not recognize options['weight'] = {0}.".format(options['weight']))
 
@@ -34,9 +34,11 @@ def Bft_norm(X, normtype):
     """
 
     N, M = X.shape
+    # float32 data stays float32 (the statistics are accumulated in float64)
+    dt = X.dtype if X.dtype == np.float32 else np.dtype(np.float64)
     if normtype == 1:
-        mf = np.mean(X, axis=0)
-        sf = np.std(X, axis=0)
+        mf = np.mean(X, axis=0, dtype=np.float64)
+        sf = np.std(X, axis=0, dtype=np.float64)
         a = np.ones((1, M)) / sf
         b = -mf / sf
     else:
@@ -46,6 +48,6 @@ def Bft_norm(X, normtype):
         a = np.ones((1, M)) / md
         b = -mi / md
 
-    Xnew = X * np.dot(np.ones((N, 1)), a) + np.ones((N, 1)) * b
+    Xnew = X * a.astype(dt) + b.astype(dt)
 
     return Xnew, a, b
\ No newline at end of file
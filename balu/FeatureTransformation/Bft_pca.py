@@ -63,10 +63,11 @@ def Bft_pca(X, m):
     else:
         energy = 0
 
-    mx = np.mean(X, axis=0)
+    # float32 data stays float32 (the mean and the covariance are computed in float64)
+    dt = X.dtype if X.dtype == np.float32 else np.dtype(np.float64)
+    mx = np.mean(X, axis=0, dtype=np.float64)
     mx = np.expand_dims(mx, 1).T
-    MX = np.dot(np.ones((N, 1)), mx)
-    X0 = X - MX
+    X0 = X - mx.astype(dt)
     Cx = np.cov(X.T)
     lbd, A = np.linalg.eig(Cx)
 
@@ -84,8 +85,10 @@ def Bft_pca(X, m):
         m = ii[0]
 
     B = A[:, 0:m]
+    if dt == np.float32:
+        B = B.real.astype(dt)
     Y = np.dot(X0, B)   # Y = X0 * A
     Y = Y[:, 0:m]   # the first m components
-    Xs = np.dot(Y, B.T) + MX
+    Xs = np.dot(Y, B.T) + mx.astype(dt)
 
     return Y, lbd, A, Xs, mx
@@ -3,37 +3,114 @@ import numpy as np
 
 
 def Bft_sigmoid(sc, d, show=False):
-    """ function [param]=fitSigmoid2Scores(posFeats, negFeats, classifier, display)
-     original de A.Soto
-     nPosExamples=size(posFeats,1);
-     nNegExamples=size(negFeats,1);
+    """ param = Bft_sigmoid(sc, d, show)     Fitting
+     y = Bft_sigmoid(sc, param)              Evaluation
 
-     [predict_label, accuracy, posScores]=svmpredict31EchoOff(ones(nPosExamples,1), posFeats, classifier);
-     [predict_label, accuracy, negScores]=svmpredict31EchoOff(ones(nNegExamples,1), negFeats, classifier);
+     Toolbox: Balu
+        Sigmoid function y = 1 / (1 + exp(-a * (sc - b))), param = [a, b].
 
-     Modificado por D.Mery
+        Fitting (d has more than 2 elements): d are the labels of the scores
+        sc, the samples of class max(d) are the positives (y = 1) and the
+        samples of class min(d) the negatives (y = 0). param is the maximum
+        likelihood fit of Platt (1999): logistic regression of the targets
+        (N+ + 1) / (N+ + 2) and 1 / (N- + 2) on the scores, solved with
+        Newton's method (2 x 2 system of vectorized sums over the scores,
+        with backtracking line search). It needs a few iterations for
+        millions of scores. show = True plots the scores and the sigmoid.
 
-     With collaboration from:
-     Diego Patiño (dapatinoco@unal.edu.co) -> Translated implementation into python (2016)
+        Evaluation (d = param): y is the sigmoid of the scores sc (same shape
+        as sc). The classifiers use it with options['output'] = 3 (see
+        Bcl_outscore): their options['param'] is fitted in training to the
+        correct (positive) and wrong (negative) decisions on the design data
+        given the gap between the two best discriminant functions.
+
+     Example:
+        import numpy as np
+        from balu.FeatureTransformation import Bft_sigmoid
+
+        sc = np.hstack((np.random.randn(1000000) - 1, np.random.randn(1000000) + 1))
+        d = np.repeat([1, 2], 1000000)
+        param = Bft_sigmoid(sc, d)              # fitting (about [2, 0])
+        y = Bft_sigmoid(np.array([-1, 0, 1]), param)
+
+     See also Bcl_outscore.
+
+     Original Matlab version (fitSigmoid2Scores) by A. Soto, modified by D. Mery.
     """
 
-    '''if d.size > 2:
-        dneg = np.amin(d);
-        dpos = np.amax(d);
+    d = np.asarray(d)
+    if d.size > 2:
+        sc = np.asarray(sc, dtype=float).ravel()
+        d = d.ravel()
+        dneg = np.amin(d)
+        dpos = np.amax(d)
+        if dneg == dpos:
+            print('Bft_sigmoid: the fitting requires scores of two classes.')
+            exit()
+        x = np.hstack((sc[d == dneg], sc[d == dpos]))
+        npos = np.sum(d == dpos)
+        nneg = np.sum(d == dneg)
+        y = np.hstack((np.zeros(nneg) + 1.0 / (nneg + 2), np.zeros(npos) + (npos + 1.0) / (npos + 2)))
+
+        param = _fit(x, y)
+        if show:
+            from matplotlib.pyplot import figure, plot, show as pshow
+            figure()
+            plot(x, np.hstack((np.zeros(nneg), np.ones(npos))), 'b.')
+            t = np.linspace(x.min(), x.max(), 200)
+            plot(t, _sigmoid(t, param), 'r')
+            pshow()
+        return param
+
+    return _sigmoid(np.asarray(sc, dtype=float), d)
 
-        posScores = sc(d == dpos);
-        negScores = sc(d == dneg);
 
-        nPosExamples = length(posScores);
-        nNegExamples = length(negScores);
+def _sigmoid(x, param):
+    # 1 / (1 + exp(-z)) without overflow
+    z = param[0] * (x - param[1])
+    e = np.exp(-np.abs(z))
+    return np.where(z >= 0, 1 / (1 + e), e / (1 + e))
 
-        x = [negScores;
-        posScores];
 
-        y = [zeros(nNegExamples, 1);
-        ones(nPosExamples, 1)];
+def _loss(f, y):
+    # negative log-likelihood of the targets y for the log-odds f
+    return np.sum(np.logaddexp(0, f) - y * f)
 
-        param = nlinfit(x, y, @ fsig, [-1 0.05]);'''
 
+def _fit(x, y, niter=100, tol=1e-10):
+    # Newton's method for the log-odds f = A * x + B (Platt, 1999; Lin et
+    # al., 2007), then a = A and b = -B / A
+    s = np.std(x)
+    s = s if s > 0 else 1.0
+    m = np.mean(x)
+    u = (x - m) / s                         # scaled scores (better conditioned)
+    A = 0.0
+    B = np.log(np.sum(y) / np.sum(1 - y))
+    f = A * u + B
+    L = _loss(f, y)
+    for it in range(niter):
+        p = _sigmoid(f, [1, 0])
+        w = p * (1 - p)
+        r = p - y
+        g = np.array([np.dot(r, u), np.sum(r)])
+        if np.abs(g).max() < tol * y.size:
+            break
+        wu = w * u
+        H = np.array([[np.dot(wu, u), np.sum(wu)], [np.sum(wu), np.sum(w)]]) + 1e-12 * np.eye(2)
+        step = np.linalg.solve(H, g)
+        t = 1.0
+        while t > 1e-10:
+            A1 = A - t * step[0]
+            B1 = B - t * step[1]
+            f1 = A1 * u + B1
+            L1 = _loss(f1, y)
+            if L1 < L + 1e-4 * t * np.dot(g, -step):
+                break
+            t /= 2
+        if t <= 1e-10:
+            break
+        A, B, f, L = A1, B1, f1, L1
 
-    return 0
\ No newline at end of file
+    a = A / s                               # f = a * (x - b)
+    b = m - B * s / A if A != 0 else m
+    return np.array([a, b])
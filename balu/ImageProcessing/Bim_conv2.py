@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from scipy import ndimage
+from scipy.signal import fftconvolve
+
+# Kernels with at least this number of elements (and not separable) are
+# convolved in the frequency domain.
+FFT_SIZE = 225
+
+_MODES = {'fill': 'constant', 'symm': 'reflect', 'wrap': 'wrap'}
+_PADS = {'constant': 'constant', 'reflect': 'symmetric', 'mirror': 'reflect', 'nearest': 'edge', 'wrap': 'wrap'}
+
+
+def Bim_conv2(X, K, boundary='fill', dtype=None, out=None, method='auto'):
+    """ Y = Bim_conv2(X, K, boundary, dtype, out, method)
+
+     Toolbox: Balu
+        2D convolution of image X with kernel K. The output has the size of X,
+        as scipy.signal.convolve2d(X, K, 'same', boundary).
+
+        This is the convolution used by the functions of the toolbox. The
+        algorithm is chosen according to the kernel:
+           - 'separable': K has rank one (or K is a tuple (kv, kh) of 1D kernels
+                          meaning the kernel kv[:, None] * kh[None, :]). Two 1D
+                          convolutions are computed.
+           - 'fft'      : large kernels (K.size >= FFT_SIZE) in the frequency domain.
+           - 'direct'   : other kernels.
+        method can be used to force one of them (default 'auto').
+
+        boundary : 'fill' (zeros, default), 'symm' or 'wrap' as in convolve2d,
+                   or any mode of scipy.ndimage (e.g. 'nearest').
+        dtype    : type of the output. By default float32 images are kept in
+                   float32 and any other image gives float64.
+        out      : optional preallocated output array (of size X.shape).
+
+     Example:
+        import numpy as np
+        from balu.ImagesAndData import balu_imageload
+        from balu.ImageProcessing import Bim_conv2
+        from scipy.signal import convolve2d
+
+        I = balu_imageload('rice.png').astype(np.float32)
+        K = np.ones((5, 5)) / 25.0
+        J = Bim_conv2(I, K)                            # separable, float32
+        print(np.abs(J - convolve2d(I, K, 'same')).max())
+
+     See also Bim_ordfilt2.
+    """
+
+    X = np.asarray(X)
+    if dtype is None:
+        if out is not None:
+            dtype = out.dtype
+        elif X.dtype == np.float32:
+            dtype = np.float32
+        else:
+            dtype = np.float64
+    mode = _MODES.get(boundary, boundary)
+
+    if isinstance(K, tuple):
+        kv = np.asarray(K[0], dtype).ravel()
+        kh = np.asarray(K[1], dtype).ravel()
+        K = np.outer(kv, kh)
+    else:
+        K = np.asarray(K, dtype)
+        kv = kh = None
+        if K.shape[0] == 1:
+            kv, kh = np.ones(1, dtype), K[0, :]
+        elif K.shape[1] == 1:
+            kv, kh = K[:, 0], np.ones(1, dtype)
+        elif method in ('auto', 'separable'):
+            u, s, vt = np.linalg.svd(K.astype(float))
+            if s[1] <= s[0] * max(K.shape) * np.finfo(dtype).eps:
+                kv = (u[:, 0] * np.sqrt(s[0])).astype(dtype)
+                kh = (vt[0, :] * np.sqrt(s[0])).astype(dtype)
+
+    if method == 'auto':
+        if kv is not None:
+            method = 'separable'
+        elif K.size >= FFT_SIZE:
+            method = 'fft'
+        else:
+            method = 'direct'
+
+    if out is None:
+        out = np.empty(X.shape, dtype)
+
+    if method == 'separable':
+        if kv is None:
+            raise ValueError('Bim_conv2: kernel is not separable.')
+        T = np.empty(X.shape, dtype)
+        ndimage.convolve1d(X.astype(dtype, copy=False), kv, axis=0, output=T, mode=mode,
+                           origin=-(1 - kv.size % 2))
+        ndimage.convolve1d(T, kh, axis=1, output=out, mode=mode, origin=-(1 - kh.size % 2))
+    elif method == 'fft':
+        Y = X.astype(dtype, copy=False)
+        if mode == 'constant':
+            out[...] = fftconvolve(Y, K, mode='same')
+        else:
+            pv, ph = K.shape[0], K.shape[1]
+            Y = np.pad(Y, ((pv, pv), (ph, ph)), _PADS[mode])
+            out[...] = fftconvolve(Y, K, mode='same')[pv:pv + X.shape[0], ph:ph + X.shape[1]]
+    else:
+        ndimage.convolve(X.astype(dtype, copy=False), K, output=out, mode=mode,
+                         origin=[-(1 - n % 2) for n in K.shape])
+
+    return out
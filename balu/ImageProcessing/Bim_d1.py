@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
-from scipy import signal
 import numpy as np
+from .Bim_conv2 import Bim_conv2
 
 
 def Bim_d1(X, m):
@@ -50,8 +50,8 @@ def Bim_d1(X, m):
     mgx = np.sum(np.abs(np.asarray(Gx).ravel()))/2.0*(0.3192*m-0.3543)
     Gx = Gx/mgx
     Gy = Gy/mgx
-    Yx = signal.convolve2d(X,Gx,'same')
-    Yy = signal.convolve2d(X,Gy,'same')
+    Yx = Bim_conv2(X,Gx)
+    Yy = Bim_conv2(X,Gy)
     Y0 = np.sqrt(Yx*Yx+Yy*Yy)
     N,M = X.shape
     Y = np.zeros((N,M))
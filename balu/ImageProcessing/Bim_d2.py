@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
-from scipy import signal
 import numpy as np
+from .Bim_conv2 import Bim_conv2
 
 def Bim_d2(X):
     """
@@ -14,7 +14,7 @@ def Bim_d2(X):
         I grayvalue image.
     
     Output:
-        J = signal.convolve2d(I,np.array([[0,1,0],[1,-4,1],[0,1,0]]),'same');
+        J = Bim_conv2(I,np.array([[0,1,0],[1,-4,1],[0,1,0]]));
     
     Example:
         import numpy as np
@@ -34,5 +34,5 @@ def Bim_d2(X):
         
     """
     
-    return signal.convolve2d(X,np.array([[0,1,0],[1,-4,1],[0,1,0]]),'same')
+    return Bim_conv2(X,np.array([[0,1,0],[1,-4,1],[0,1,0]]))
 
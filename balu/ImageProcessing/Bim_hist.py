@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+
+def Bim_hist(I, H=None, rng=None, b=256):
+    """ H = Bim_hist(I)
+     H = Bim_hist(I, H)
+
+     Toolbox: Balu
+        Accumulated histogram of an image (or of a sequence of tiles/frames).
+
+        I   : grayvalue image (or tile).
+        H   : histogram to be updated with I. If H is None a new histogram is created.
+        rng : (min, max) range of the bins for non integer images. By default the
+              range of the first image is used, so when a float histogram is
+              accumulated over tiles the global range should be given.
+        b   : number of bins for non integer images (default 256).
+
+        uint8 and uint16 images are counted directly with np.bincount in 256 and
+        65536 bins (one bin per gray level). Other images are counted in b bins
+        using np.histogram.
+
+        Output:
+           H is a dictionary with:
+           H['h']     number of pixels of each bin,
+           H['x']     center of each bin,
+           H['range'] range of the bins (None for integer histograms),
+           H['min']   minimal value of the counted pixels,
+           H['max']   maximal value of the counted pixels.
+
+        Example:
+            from balu.ImagesAndData import balu_imageload
+            from balu.ImageProcessing import Bim_hist, Bim_otsu
+
+            I = balu_imageload('rice.png')
+            H = Bim_hist(I[0:128, :])                   # first half
+            H = Bim_hist(I[128:, :], H)                 # second half
+            t = Bim_otsu(H)                             # threshold of the whole image
+
+        See also Bim_otsu, Bim_segotsu.
+    """
+
+    I = np.asarray(I)
+    if H is None:
+        if I.dtype == np.uint8 or I.dtype == np.uint16:
+            n = 256 if I.dtype == np.uint8 else 65536
+            H = {'h': np.zeros(n, np.int64), 'x': np.arange(n, dtype=float), 'range': None}
+        else:
+            if rng is None:
+                rng = (float(I.min()), float(I.max()))
+            e = np.linspace(rng[0], rng[1], b + 1)
+            H = {'h': np.zeros(b, np.int64), 'x': (e[:-1] + e[1:]) / 2.0, 'range': tuple(rng)}
+        H['min'] = np.inf
+        H['max'] = -np.inf
+
+    if I.size == 0:
+        return H
+
+    if H['range'] is None:
+        h = np.bincount(I.ravel(), minlength=H['h'].size)
+        H['h'] += h
+        ii = np.nonzero(h)[0]
+        H['min'] = min(H['min'], H['x'][ii[0]])
+        H['max'] = max(H['max'], H['x'][ii[-1]])
+    else:
+        H['h'] += np.histogram(I, H['h'].size, range=H['range'])[0]
+        H['min'] = min(H['min'], float(I.min()))
+        H['max'] = max(H['max'], float(I.max()))
+
+    return H
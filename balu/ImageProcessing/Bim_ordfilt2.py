@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from scipy import ndimage
+
+_MODES = {'fill': 'constant', 'symm': 'reflect', 'wrap': 'wrap'}
+
+
+def Bim_ordfilt2(X, rank, m, boundary='fill', out=None):
+    """ Y = Bim_ordfilt2(X, rank, m, boundary, out)
+
+     Toolbox: Balu
+        2D order-statistic filtering of image X in m x m neighbourhoods. Each
+        pixel is replaced by the rank-th element (0-based, as in
+        scipy.signal.order_filter) of the sorted neighbourhood.
+
+        rank can also be 'min', 'max' or 'median'. The minimum, maximum and
+        median are computed with the specialized filters of scipy.ndimage.
+
+        boundary : 'fill' (zeros, default as in order_filter), 'symm', 'wrap'
+                   or any mode of scipy.ndimage (e.g. 'nearest').
+        out      : optional preallocated output array (of size X.shape).
+
+     Example:
+        from balu.ImagesAndData import balu_imageload
+        from balu.ImageProcessing import Bim_ordfilt2
+        from scipy.signal import order_filter
+        import numpy as np
+
+        I = balu_imageload('rice.png').astype(float)
+        J = Bim_ordfilt2(I, 0, 3)                      # minimum in 3 x 3
+        print(np.abs(J - order_filter(I, np.ones((3, 3)), 0)).max())
+
+     See also Bim_conv2.
+    """
+
+    X = np.asarray(X)
+    mode = _MODES.get(boundary, boundary)
+    n = m * m
+    if rank == 'min':
+        rank = 0
+    elif rank == 'max':
+        rank = n - 1
+    elif rank == 'median':
+        rank = n // 2
+
+    if out is None:
+        out = np.empty(X.shape, X.dtype)
+
+    if rank == 0:
+        ndimage.minimum_filter(X, size=m, output=out, mode=mode)
+    elif rank == n - 1:
+        ndimage.maximum_filter(X, size=m, output=out, mode=mode)
+    elif rank == n // 2 and n % 2 == 1:
+        ndimage.median_filter(X, size=m, output=out, mode=mode)
+    else:
+        ndimage.rank_filter(X, rank, size=m, output=out, mode=mode)
+
+    return out
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from .Bim_hist import Bim_hist
+
+
+def Bim_otsu(I, p=0, inv=False):
+    """ t = Bim_otsu(I, p, inv)
+     t = Bim_otsu(H, p, inv)
+
+     Toolbox: Balu
+        Otsu threshold of a grayvalue image I or of a precomputed histogram H
+        (see Bim_hist).
+
+        The threshold is given in the normalized scale of Bim_maxmin(I), i.e.
+        0 and 1 correspond to the minimal and maximal gray values, so that the
+        segmentation is Bim_maxmin(I) > t. p is added to the threshold (as in
+        Bim_segotsu). If inv is True the threshold is computed for the inverted
+        image 1 - Bim_maxmin(I).
+
+        uint8 and uint16 images are evaluated on one bin per gray level (256 or
+        65536 bins), other images on the 256 bins of Bim_hist.
+
+        Example:
+            from balu.ImagesAndData import balu_imageload
+            from balu.ImageProcessing import Bim_otsu, Bim_maxmin
+            from matplotlib.pyplot import figure, imshow, show
+
+            I = balu_imageload('rice.png')
+            t = Bim_otsu(I)
+            figure(1), imshow(Bim_maxmin(I) > t, cmap='gray')
+            show()
+
+        See also Bim_hist, Bim_segotsu.
+    """
+
+    if isinstance(I, dict):
+        H = I
+    else:
+        H = Bim_hist(I)
+
+    ii = np.nonzero(H['h'])[0]
+    h = H['h'][ii[0]:ii[-1] + 1].astype(float)
+    x = H['x'][ii[0]:ii[-1] + 1]
+
+    lo = H['min']
+    hi = H['max']
+    if hi > lo:
+        x = (x - lo) / (hi - lo)
+    else:
+        x = np.zeros(x.shape)
+
+    if inv:
+        h = h[::-1]
+        x = 1 - x[::-1]
+
+    if h.size < 2:
+        return x[0] + p
+
+    weight1 = np.cumsum(h)
+    weight2 = np.cumsum(h[::-1])[::-1]
+    mean1 = np.cumsum(h * x) / weight1
+    mean2 = (np.cumsum((h * x)[::-1]) / weight2[::-1])[::-1]
+    variance12 = weight1[:-1] * weight2[1:] * (mean1[:-1] - mean2[1:]) ** 2
+    t = x[:-1][np.argmax(variance12)]
+
+    return t + p
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from scipy.misc import imresize
+from scipy.ndimage import gaussian_filter
+
+
+def Bim_pyramid(I, downscale=2, sigma=None, minsize=8):
+    """ P = Bim_pyramid(I, downscale, sigma, minsize)
+
+     Toolbox: Balu
+        Gaussian pyramid of image I (gray or color). The levels are computed
+        only when they are requested (see Bim_pyramidlevel) and are kept in P,
+        so every stage that works on the same image at a reduced scale shares
+        them instead of resizing the full image again.
+
+        downscale: integer reduction factor between levels (default 2).
+        sigma    : sigma of the Gaussian filter applied before subsampling
+                   (default 2*downscale/6, as in skimage pyramid_reduce).
+        minsize  : smallest size (rows or columns) of a level (default 8).
+
+        P can be given to Bim_segbalu, Bim_rgb2hcm and Bfx_fourier instead
+        of the image.
+
+     Example:
+        from balu.ImagesAndData import balu_imageload
+        from balu.ImageProcessing import Bim_pyramid, Bim_pyramidlevel, Bim_segbalu
+        from balu.FeatureExtraction import Bfx_fourier
+        from matplotlib.pyplot import figure, imshow, show
+
+        I = balu_imageload('testimg1.jpg')
+        P = Bim_pyramid(I)
+        R, E, J = Bim_segbalu(P, level=1)           # segmentation at half size
+        options = {'Nfourier': 64, 'Mfourier': 64, 'nfourier': 2, 'mfourier': 2}
+        X, Xn = Bfx_fourier(P, options)             # uses the cached levels
+        figure(1), imshow(Bim_pyramidlevel(P, 2).astype('uint8'))
+        figure(2), imshow(R, cmap='gray')
+        show()
+
+     See also Bim_pyramidlevel, Bim_pyramidresize.
+    """
+
+    downscale = int(downscale)
+    if downscale < 2:
+        print('Bim_pyramid: downscale must be an integer greater than 1.')
+        exit()
+    if sigma is None:
+        sigma = 2 * downscale / 6.0
+    return {'levels': [I], 'downscale': downscale, 'sigma': sigma, 'minsize': minsize, 'resized': {}}
+
+
+def Bim_pyramidlevel(P, k):
+    """ I = Bim_pyramidlevel(P, k)
+
+     Toolbox: Balu
+        Level k of pyramid P (level 0 is the original image). The level and the
+        ones before it are computed once and kept in P. If k is greater than the
+        last level (size smaller than P['minsize']) the last level is returned.
+
+     See also Bim_pyramid, Bim_pyramidresize.
+    """
+
+    levels = P['levels']
+    d = P['downscale']
+    while len(levels) <= k:
+        L = levels[-1]
+        if min(L.shape[0], L.shape[1]) // d < P['minsize']:
+            break
+        s = P['sigma']
+        G = gaussian_filter(L.astype(float), (s, s, 0)[:L.ndim], mode='reflect')
+        levels.append(G[::d, ::d])
+    return levels[min(k, len(levels) - 1)]
+
+
+def Bim_pyramidresize(P, size, interp='bilinear'):
+    """ J = Bim_pyramidresize(P, size, interp)
+
+     Toolbox: Balu
+        imresize(I, size, interp) of the image of pyramid P (see scipy.misc.imresize),
+        computed from the smallest level that is not smaller than size. The
+        result is kept in P, thus the same resize is done only once per image.
+
+     See also Bim_pyramid, Bim_pyramidlevel.
+    """
+
+    size = (int(size[0]), int(size[1]))
+    key = (size, interp)
+    if key not in P['resized']:
+        d = P['downscale']
+        N, M = P['levels'][0].shape[0:2]
+        k = 0
+        while min(N, M) // d >= P['minsize'] and -(-N // d) >= size[0] and -(-M // d) >= size[1]:
+            N, M = -(-N // d), -(-M // d)
+            k += 1
+        I = Bim_pyramidlevel(P, k)
+        P['resized'][key] = imresize(I.astype(float), size, interp=interp)
+    return P['resized'][key]
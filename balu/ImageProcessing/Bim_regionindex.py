@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+
+def Bim_regionindex(L):
+    """ Ri = Bim_regionindex(L)
+
+     Toolbox: Balu
+        Index of the regions of a labeled image L (e.g. the output of
+        Bim_segmowgli), computed with a single sort of the labels.
+
+        Ri is a dictionary with:
+           Ri['shape'] size of L.
+           Ri['n']     number of labels (max(L)).
+           Ri['area']  number of pixels of region k in Ri['area'][k - 1].
+           Ri['bbox']  bounding box (i1, j1, i2, j2) of region k in Ri['bbox'][k - 1, :]
+                       (i2 and j2 are included in the box).
+           Ri['idx']   flat indices (in raster order) of the pixels of all regions,
+                       sorted by label.
+           Ri['ptr']   the pixels of region k are Ri['idx'][Ri['ptr'][k - 1]:Ri['ptr'][k]].
+
+        Thus the pixels of a region can be read in O(area) instead of scanning
+        the whole image with L == k. Bfx_geo, Bio_labelregion and Bio_edgeview
+        accept Ri instead of L.
+
+     Example:
+        import numpy as np
+        from balu.ImagesAndData import balu_imageload
+        from balu.ImageProcessing import Bim_segmowgli, Bim_regionwindow
+
+        I = balu_imageload('rice.png')
+        F, m, Ri = Bim_segmowgli(I, None, 40, 1.5, index=True)
+        ii, jj = np.unravel_index(Ri['idx'][Ri['ptr'][9]:Ri['ptr'][10]], Ri['shape'])  # region 10
+        R, i0, j0 = Bim_regionwindow(Ri, 10)        # binary window of region 10
+        print(Ri['area'][9], R.sum())
+
+     See also Bim_regionwindow, Bim_segmowgli.
+    """
+
+    L = np.asarray(L)
+    N, M = L.shape
+    Lf = L.ravel().astype(np.intp)
+    n = int(Lf.max()) if Lf.size > 0 else 0
+
+    area = np.bincount(Lf, minlength=n + 1)
+    order = np.argsort(Lf, kind='mergesort')
+    idx = order[area[0]:]
+    ptr = np.cumsum(np.hstack((0, area[1:])))
+
+    bbox = np.zeros((n, 4), np.intp)
+    k = np.where(area[1:] > 0)[0]
+    if k.size > 0:
+        ii = idx // M
+        jj = idx % M
+        start = ptr[k]
+        bbox[k, 0] = np.minimum.reduceat(ii, start)
+        bbox[k, 1] = np.minimum.reduceat(jj, start)
+        bbox[k, 2] = np.maximum.reduceat(ii, start)
+        bbox[k, 3] = np.maximum.reduceat(jj, start)
+
+    return {'shape': (N, M), 'n': n, 'area': area[1:], 'bbox': bbox, 'idx': idx, 'ptr': ptr}
+
+
+def Bim_regionwindow(Ri, k, g=1):
+    """ R, i0, j0 = Bim_regionwindow(Ri, k, g)
+
+     Toolbox: Balu
+        Binary image R of region k of the region index Ri (see Bim_regionindex)
+        in a window of the original image: the bounding box of the region with
+        a margin of g pixels (clipped at the image border). (i0, j0) is the
+        position of R[0, 0] in the original image.
+    """
+
+    N, M = Ri['shape']
+    i1, j1, i2, j2 = Ri['bbox'][k - 1]
+    i0 = max(i1 - g, 0)
+    j0 = max(j1 - g, 0)
+    R = np.zeros((min(i2 + g + 1, N) - i0, min(j2 + g + 1, M) - j0), bool)
+    p = Ri['idx'][Ri['ptr'][k - 1]:Ri['ptr'][k]]
+    R[p // M - i0, p % M - j0] = True
+    return R, i0, j0
@@ -2,10 +2,12 @@
 import numpy as np
 from scipy.misc import imresize
 from scipy.optimize import minimize
+from .Bim_pyramid import Bim_pyramidlevel, Bim_pyramidresize
 
 
-def Bim_rgb2hcm(RGB):
+def Bim_rgb2hcm(RGB, level=0):
     """ J = Bim_rgb2hcm(RGB)
+     J = Bim_rgb2hcm(P, level)
 
      Toolbox: Balu
         Conversion RGB to high contrast image.
@@ -13,6 +15,10 @@ def Bim_rgb2hcm(RGB):
         RGB: color image
         J  : hcm image
 
+        RGB can also be a pyramid P of the image (see Bim_pyramid), then J is
+        computed at the given level of P and the 64x64 image used to estimate
+        the projection is taken from (and kept in) P.
+
       See details in:
       Mery, D.; Pedreschi, F. (2005): Segmentation of Colour Food Images using
       a Robust Algorithm. Journal of Food Engineering 66(3): 353-360.
@@ -32,11 +38,20 @@ def Bim_rgb2hcm(RGB):
      Diego Patiño (dapatinoco@unal.edu.co) -> Translated implementation into python (2016)
     """
 
+    if isinstance(RGB, dict):
+        P = RGB
+        RGB = Bim_pyramidlevel(P, level)
+    else:
+        P = None
+
     RGB = RGB.astype(float)
     if len(RGB.shape) < 3:
         I = RGB
     else:
-        RGB64 = imresize(RGB, (64, 64), interp='bicubic')
+        if P is None:
+            RGB64 = imresize(RGB, (64, 64), interp='bicubic')
+        else:
+            RGB64 = Bim_pyramidresize(P, (64, 64), interp='bicubic')
         #k = fminsearch(@Bstdmono,[1 1],[],RGB64)
 
         def f(k):
@@ -2,10 +2,12 @@
 from skimage.filters import threshold_otsu
 from .Bim_rgb2hcm import Bim_rgb2hcm
 from .Bim_morphoreg import Bim_morphoreg
+from .Bim_pyramid import Bim_pyramid
 
 
-def Bim_segbalu(I, p=-0.05):
+def Bim_segbalu(I, p=-0.05, level=0):
     """ R, E, J = Bim_segbalu(I, p)
+     R, E, J = Bim_segbalu(P, p, level)
 
      Toolbox: Balu
       Segmentation of an object with homogeneous background.
@@ -18,6 +20,10 @@ def Bim_segbalu(I, p=-0.05):
       E: binary image of the edge of the object
       J: high contrast image of I.
 
+      I can also be a pyramid P of the image (see Bim_pyramid), shared with
+      other stages that use the same image. The segmentation is performed at
+      the given level of P (level 0 is the original size).
+
       See details in:
       Mery, D.; Pedreschi, F. (2005): Segmentation of Colour Food Images using
       a Robust Algorithm. Journal of Food Engineering 66(3): 353-360.
@@ -47,7 +53,12 @@ def Bim_segbalu(I, p=-0.05):
      Diego Patiño (dapatinoco@unal.edu.co) -> Translated implementation into python (2016)
     """
 
-    J = Bim_rgb2hcm(I.astype(float) / 256.0)
+    if isinstance(I, dict) or level > 0:
+        if not isinstance(I, dict):
+            I = Bim_pyramid(I)
+        J = Bim_rgb2hcm(I, level)
+    else:
+        J = Bim_rgb2hcm(I.astype(float) / 256.0)
     t = threshold_otsu(J)
     R, E = Bim_morphoreg(J, t+p)
     return R, E, J
@@ -1,15 +1,18 @@
 # -*- coding: utf-8 -*-
-import scipy as sp
 import numpy as np
 from skimage.morphology import label, disk, dilation, remove_small_objects
 from skimage.color import rgb2gray
 from scipy.ndimage.morphology import binary_erosion, binary_closing
-from skimage.filters import laplace, gaussian
+from skimage.util import img_as_float
+from .Bim_conv2 import Bim_conv2
+from .Bim_ordfilt2 import Bim_ordfilt2
+from .Bim_regionindex import Bim_regionindex
 import matplotlib.pyplot as plt
 
 
-def Bim_segmowgli(J, R=None, Amin=20, sig=2):
+def Bim_segmowgli(J, R=None, Amin=20, sig=2, index=False):
     """  F, m = Bsegmowgli(J, R, Amin, sig)
+       F, m, Ri = Bsegmowgli(J, R, Amin, sig, index=True)
 
      Toolbox: Balu
       Segmentation of regions in image J using LoG edge detection.
@@ -19,6 +22,9 @@ def Bim_segmowgli(J, R=None, Amin=20, sig=2):
       sig : sigma of LoG edge detector.
       F   : labeled image of the segmentation.
       m   : numbers of segmented regions.
+      Ri  : region index of F (see Bim_regionindex), returned if index=True.
+            It can be given to Bfx_geo, Bio_labelregion and Bio_edgeview
+            instead of F.
 
       Example 1:
             from balu.ImagesAndData import balu_imageload
@@ -75,7 +81,7 @@ def Bim_segmowgli(J, R=None, Amin=20, sig=2):
 
     se = disk(3)
     Re = dilation(R, se)
-    E = R - binary_erosion(R)
+    E = np.logical_xor(R, binary_erosion(R))
 
     #In the original implementation of Balu Matlab they used LoG edge detection.
     #Here we used edge detection via Canny algorithm. Then we used 0.5*sig because
@@ -85,37 +91,52 @@ def Bim_segmowgli(J, R=None, Amin=20, sig=2):
     L = np.logical_or(np.logical_and(L, Re), E)
     W = remove_small_objects(L, min_size=Amin, connectivity=2)
     F = label(np.logical_not(W), 4)
-    m = int(F.max())
-    for i in range(1, m + 1):
-        ii, jj = np.where(F == i)
-        if (ii.size < Amin) or (ii.size > N*M / 6.0):
-            W[ii, jj] = 1
+    A = np.bincount(F.ravel())               # area of each region
+    small = np.logical_or(A < Amin, A > N*M / 6.0)
+    small[0] = False
+    W[small[F]] = 1
 
     F = label(np.logical_not(W), 4)
     m = int(F.max())
     print('{0} segmented regions.\n'.format(m))
+    if index:
+        return F, m, Bim_regionindex(F)
     return F, m
 
 def edge_LoG(I, sigma):
-    LoG = laplace(gaussian(I, sigma=sigma), ksize=3)
+    LoG = _log(I, sigma)
     thres = np.absolute(LoG).mean() * 1.0
-    output = sp.zeros(LoG.shape)
-    w = output.shape[1]
-    h = output.shape[0]
-
-    for y in range(1, h - 1):
-        for x in range(1, w - 1):
-            patch = LoG[y - 1:y + 2, x - 1:x + 2]
-            p = LoG[y, x]
-            maxP = patch.max()
-            minP = patch.min()
-            if p > 0:
-                zeroCross = True if minP < 0 else False
-            else:
-                zeroCross = True if maxP > 0 else False
-            if ((maxP - minP) > thres) and zeroCross:
-                output[y, x] = 1
 
     #FIXME: It is necesary to define if return the closing of the output or just the output
     #return binary_closing(output)
-    return output
\ No newline at end of file
+    return _zerocross(LoG, thres)
+
+
+def _log(I, sigma):
+    # laplace(gaussian(I, sigma), ksize=3) of scikit-image computed with Bim_conv2:
+    # separable gaussian kernel (truncated at 4 sigma, 'nearest' boundary)
+    # followed by the 3 x 3 laplacian ('symm' boundary) with zeroed image border.
+    J = img_as_float(I)
+    r = int(4.0 * sigma + 0.5)
+    g = np.exp(-0.5 * (np.arange(-r, r + 1) / float(sigma)) ** 2)
+    g /= g.sum()
+    G = Bim_conv2(J, (g, g), boundary='nearest')
+    LoG = Bim_conv2(G, np.array([[0, -1, 0], [-1, 4, -1], [0, -1, 0]]), boundary='symm')
+    LoG[0, :] = 0
+    LoG[-1, :] = 0
+    LoG[:, 0] = 0
+    LoG[:, -1] = 0
+    return LoG
+
+
+def _zerocross(LoG, thres):
+    # A pixel is an edge if its 3x3 neighbourhood has a sign change with respect
+    # to the pixel and a (max - min) contrast above thres. The outer border of
+    # the image is never marked.
+    output = np.zeros(LoG.shape)
+    maxP = Bim_ordfilt2(LoG, 'max', 3, 'nearest')
+    minP = Bim_ordfilt2(LoG, 'min', 3, 'nearest')
+    zeroCross = np.where(LoG > 0, minP < 0, maxP > 0)
+    E = np.logical_and((maxP - minP) > thres, zeroCross)
+    output[1:-1, 1:-1] = E[1:-1, 1:-1]
+    return output
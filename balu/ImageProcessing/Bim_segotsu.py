@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 import numpy as np
-from skimage.filters import threshold_otsu
 from .Bim_morphoreg import Bim_morphoreg
 from .Bim_maxmin import Bim_maxmin
+from .Bim_hist import Bim_hist
+from .Bim_otsu import Bim_otsu
 from skimage.color import rgb2gray
 
 
@@ -16,6 +17,9 @@ def Bim_segotsu(I, p=0):
 
         Input data:
            I grayvalue image.
+           p offset added to the Otsu threshold (default p = 0).
+           uint8 and uint16 grayvalue images are thresholded on the histogram
+           of their gray levels (see Bim_otsu).
 
         Output:
            R: binary image.
@@ -33,7 +37,7 @@ def Bim_segotsu(I, p=0):
             title('segmented image')
             show()
 
-      See also Bim_segbalu, Bim_segkmeans.
+      See also Bim_segbalu, Bim_segkmeans, Bim_otsu.
 
      (c) D.Mery, PUC-DCC, 2010
      http://dmery.ing.puc.cl
@@ -50,9 +54,13 @@ def Bim_segotsu(I, p=0):
     n = int(J.shape[0] / 4.0)
     # Checks if the exterior border of the image is in fact part of the background
     # Otherwise it inverts the image
-    if np.mean(J[0:n, 0:n]) > 0.4:
+    inv = np.mean(J[0:n, 0:n]) > 0.4
+    if inv:
         J = 1 - J
 
-    t = threshold_otsu(J)
+    if len(I.shape) == 2 and (I.dtype == np.uint8 or I.dtype == np.uint16):
+        t = Bim_otsu(Bim_hist(I), inv=inv)
+    else:
+        t = Bim_otsu(J)
     R, E = Bim_morphoreg(J, t+p)
     return R, E, J
\ No newline at end of file
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from scipy import ndimage
+from scipy.misc import imresize
+from scipy.optimize import minimize
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.ndimage.morphology import binary_erosion
+from skimage.color import rgb2gray
+from skimage.morphology import closing, dilation, erosion, disk, square
+from .Bim_rgb2hcm import Bstdmono
+from .Bim_hist import Bim_hist
+from .Bim_otsu import Bim_otsu
+from .Bim_segmowgli import _log, _zerocross
+
+
+def Bim_segtiled(I, method='otsu', p=None, R=None, Amin=20, sig=2, tile=1024, tmpdir=None):
+    """ R, E = Bim_segtiled(I, 'otsu', p, tile=tile)
+     R, E = Bim_segtiled(I, 'balu', p, tile=tile)
+     F, m = Bim_segtiled(I, 'mowgli', R=R, Amin=Amin, sig=sig, tile=tile)
+
+     Toolbox: Balu
+        Tiled (out-of-core) segmentation of very large images.
+
+        I is read tile by tile, so it can be a np.memmap or any array-like
+        object that supports 2D slicing (e.g. a HDF5 dataset). The global
+        statistics (range, Otsu threshold, mean LoG response) are computed
+        in streaming passes over the tiles (see Bim_hist and Bim_otsu), each tile is processed with an
+        overlap large enough for the morphological operations and the
+        connected components are stitched across the tile seams. Thus, the
+        memory used by the processing is bounded by the tile size.
+
+        method = 'otsu'   : same segmentation as Bim_segotsu (default p = 0).
+        method = 'balu'   : same segmentation as Bim_segbalu (default p = -0.05).
+                            The coefficients of the high contrast image are
+                            estimated from a strided subsample of I.
+        method = 'mowgli' : same segmentation as Bim_segmowgli (R, Amin and sig
+                            have the same meaning). R can be None or an
+                            array-like binary image.
+
+        tile   : size in pixels of the (square) tiles (default 1024).
+        tmpdir : directory for the output images. If it is given, the outputs are
+                 np.memmap files in tmpdir ('R.dat', 'E.dat' or 'F.dat'),
+                 otherwise they are in memory. The scratch label image used for
+                 stitching is always a temporary np.memmap (in tmpdir if given).
+
+        Output:
+           R, E binary images of the object and its edge (methods 'otsu' and 'balu').
+           F, m labeled image of the segmentation and number of regions (method 'mowgli').
+
+      Example:
+            import numpy as np
+            from balu.ImagesAndData import balu_imageload
+            from balu.ImageProcessing import Bim_segtiled, Bim_segotsu
+            from matplotlib.pyplot import figure, imshow, show, title
+
+            X = balu_imageload('testimg1.jpg')
+            np.save('/tmp/testimg1.npy', X)
+            I = np.load('/tmp/testimg1.npy', mmap_mode='r')      # image on disk
+            R, E = Bim_segtiled(I, 'otsu', tile=128)
+            R0, E0, J0 = Bim_segotsu(X)
+            print('same segmentation: {0}'.format(np.all(R == R0)))
+            figure(1), imshow(R, cmap='gray'), title('tiled segmentation')
+            show()
+
+      See also Bim_segotsu, Bim_segbalu, Bim_segmowgli.
+    """
+
+    N, M = I.shape[0:2]
+    if tmpdir is not None:
+        work = mkdtemp(dir=tmpdir)
+    else:
+        work = mkdtemp()
+    S = np.memmap(join(work, 'L.dat'), dtype=np.int32, mode='w+', shape=(N, M))
+
+    try:
+        if method == 'mowgli':
+            return _segmowgli(I, R, Amin, sig, tile, tmpdir, S)
+
+        if method == 'balu':
+            if p is None:
+                p = -0.05
+            gray = _hcm(I)
+            n, m = int(np.floor(N / 4.0)), int(np.floor(M / 4.0))
+        else:
+            if p is None:
+                p = 0
+            gray = _gray
+            n, m = int(N / 4.0), int(N / 4.0)
+
+        # Global range of the gray image and mean of its upper-left corner. For
+        # uint8/uint16 images the histogram of the gray levels is accumulated in
+        # the same pass (see Bim_segotsu).
+        fast = method == 'otsu' and len(I.shape) == 2 and (I.dtype == np.uint8 or I.dtype == np.uint16)
+        H = None
+        lo, hi = np.inf, -np.inf
+        s, c = 0.0, 0
+        for i0, i1, j0, j1 in _tiles((N, M), tile):
+            X = np.asarray(I[i0:i1, j0:j1])
+            if fast:
+                H = Bim_hist(X, H)
+            G = gray(X)
+            lo = min(lo, G.min())
+            hi = max(hi, G.max())
+            Gc = G[0:max(n - i0, 0), 0:max(m - j0, 0)]
+            s += Gc.sum()
+            c += Gc.size
+        inv = c > 0 and ((s / c - lo) / (hi - lo)) > 0.4
+
+        def norm(G):
+            J = (G - lo) / (hi - lo)
+            if inv:
+                J = 1 - J
+            return J
+
+        # Otsu threshold on the streaming histogram of the normalized image
+        if fast:
+            t = Bim_otsu(H, p, inv)
+        else:
+            for i0, i1, j0, j1 in _tiles((N, M), tile):
+                H = Bim_hist(norm(gray(np.asarray(I[i0:i1, j0:j1]))), H, (0.0, 1.0))
+            t = Bim_otsu(H, p)
+
+        return _morphoreg(lambda i0, i1, j0, j1: norm(gray(np.asarray(I[i0:i1, j0:j1]))) > t,
+                          (N, M), tile, tmpdir, S)
+    finally:
+        del S
+        rmtree(work, ignore_errors=True)
+
+
+def _gray(X):
+    Id = X.astype(float)
+    if len(X.shape) == 3 and X.shape[2] == 3:
+        Id = rgb2gray(Id / 256)
+    return Id
+
+
+def _hcm(I):
+    # Coefficients of Bim_rgb2hcm estimated on a strided subsample of I
+    if len(I.shape) < 3:
+        return lambda X: X.astype(float) / 256.0
+
+    N, M = I.shape[0:2]
+    sN = max(N // 256, 1)
+    sM = max(M // 256, 1)
+    RGB64 = imresize(np.asarray(I[::sN, ::sM]).astype(float) / 256.0, (64, 64), interp='bicubic')
+    k = minimize(lambda k: Bstdmono(k, RGB64), [1, 1])['x']
+
+    def gray(X):
+        X = X.astype(float) / 256.0
+        return k[0] * X[:, :, 0] + k[1] * X[:, :, 1] + X[:, :, 2]
+
+    return gray
+
+
+def _tiles(shape, tile):
+    N, M = shape
+    for i0 in range(0, N, tile):
+        for j0 in range(0, M, tile):
+            yield i0, min(i0 + tile, N), j0, min(j0 + tile, M)
+
+
+def _read(A, i0, i1, j0, j1, g, shape):
+    # Block [i0:i1, j0:j1] of A with a margin of g pixels (clipped at the image
+    # border) and the slices of the block that correspond to [i0:i1, j0:j1].
+    N, M = shape
+    a0, a1 = max(i0 - g, 0), min(i1 + g, N)
+    b0, b1 = max(j0 - g, 0), min(j1 + g, M)
+    if A is None:
+        B = np.ones((a1 - a0, b1 - b0), bool)
+    else:
+        B = np.asarray(A[a0:a1, b0:b1])
+    return B, (slice(i0 - a0, i1 - a0), slice(j0 - b0, j1 - b0))
+
+
+def _pairs(a, b, diag):
+    P = [np.vstack((a, b))]
+    if diag:
+        P.append(np.vstack((a[:-1], b[1:])))
+        P.append(np.vstack((a[1:], b[:-1])))
+    P = np.hstack(P)
+    return P[:, np.logical_and(P[0] > 0, P[1] > 0)]
+
+
+def _label(get, shape, tile, S, connectivity):
+    """ Connected components of the binary image given tile by tile by
+     get(i0, i1, j0, j1). The provisional labels of each tile are written in S,
+     and the labels that touch across the seams are merged.
+
+     Output is a dictionary with:
+        'comp'  : component of each provisional label (label 0 is background)
+        'area'  : area of each component
+        'first' : flat index of the first pixel (raster order) of each component
+    """
+    N, M = shape
+    structure = ndimage.generate_binary_structure(2, connectivity)
+    area = [np.zeros(1, np.int64)]
+    first = [np.array([N * M], np.int64)]
+    n = 0
+    for i0, i1, j0, j1 in _tiles(shape, tile):
+        Lt, nt = ndimage.label(get(i0, i1, j0, j1), structure)
+        lab = Lt.ravel()
+        u, fi = np.unique(lab, return_index=True)
+        fi = fi[u > 0]
+        w = j1 - j0
+        first.append((i0 + fi // w) * M + j0 + fi % w)
+        area.append(np.bincount(lab, minlength=nt + 1)[1:])
+        Lt[Lt > 0] += n
+        S[i0:i1, j0:j1] = Lt
+        n += nt
+
+    diag = connectivity == 2
+    P = [np.zeros((2, 0), np.int64)]
+    for i0 in range(tile, N, tile):
+        P.append(_pairs(np.asarray(S[i0 - 1, :]), np.asarray(S[i0, :]), diag))
+    for j0 in range(tile, M, tile):
+        for i0 in range(0, N, tile):
+            i1 = min(i0 + tile, N)
+            P.append(_pairs(np.asarray(S[i0:i1, j0 - 1]), np.asarray(S[i0:i1, j0]), diag))
+    P = np.hstack(P)
+
+    G = coo_matrix((np.ones(P.shape[1]), (P[0], P[1])), shape=(n + 1, n + 1))
+    nc, comp = connected_components(G, directed=False)
+    cfirst = np.full(nc, N * M, np.int64)
+    np.minimum.at(cfirst, comp, np.hstack(first))
+    return {
+        'comp': comp,
+        'area': np.bincount(comp, weights=np.hstack(area), minlength=nc),
+        'first': cfirst
+    }
+
+
+def _alloc(shape, dtype, tmpdir, name):
+    if tmpdir is None:
+        return np.zeros(shape, dtype)
+    return np.memmap(join(tmpdir, name), dtype=dtype, mode='w+', shape=shape)
+
+
+def _morphoreg(get, shape, tile, tmpdir, S):
+    # Tiled version of Bim_morphoreg(Ro) where Ro is given by get(i0, i1, j0, j1)
+    N, M = shape
+    minsize = int(np.floor(N * M / 100.0))
+    R = _alloc(shape, bool, tmpdir, 'R.dat')
+    E = _alloc(shape, bool, tmpdir, 'E.dat')
+
+    # remove_small_objects + closing
+    lab = _label(get, shape, tile, S, 2)
+    keep = lab['area'][lab['comp']] >= minsize
+    keep[0] = False
+    se = disk(7)
+    for i0, i1, j0, j1 in _tiles(shape, tile):
+        B, core = _read(S, i0, i1, j0, j1, 2 * se.shape[0], shape)
+        R[i0:i1, j0:j1] = closing(keep[B], se)[core].astype(bool)
+
+    # remove_small_holes
+    lab = _label(lambda i0, i1, j0, j1: np.logical_not(R[i0:i1, j0:j1]), shape, tile, S, 2)
+    fill = lab['area'][lab['comp']] < minsize
+    fill[0] = False
+    for i0, i1, j0, j1 in _tiles(shape, tile):
+        R[i0:i1, j0:j1] = np.logical_or(R[i0:i1, j0:j1], fill[S[i0:i1, j0:j1]])
+
+    # edge
+    for i0, i1, j0, j1 in _tiles(shape, tile):
+        B, core = _read(R, i0, i1, j0, j1, 1, shape)
+        E[i0:i1, j0:j1] = np.logical_xor(B, erosion(B, square(3)))[core]
+
+    return R, E
+
+
+def _segmowgli(I, R, Amin, sig, tile, tmpdir, S):
+    # Tiled version of Bim_segmowgli
+    N, M = I.shape[0:2]
+    shape = (N, M)
+    g = int(4.0 * sig + 0.5) + 3
+
+    def gray(X):
+        if len(X.shape) == 3 and X.shape[2] == 3:
+            X = rgb2gray(X.astype(float))
+        return X
+
+    # Mean of the absolute LoG response (threshold of the edge detector)
+    s = 0.0
+    for i0, i1, j0, j1 in _tiles(shape, tile):
+        B, core = _read(I, i0, i1, j0, j1, g, shape)
+        s += np.absolute(_log(gray(B), sig)[core]).sum()
+    thres = s / float(N * M)
+
+    se = disk(3)
+
+    def edges(i0, i1, j0, j1):
+        B, core = _read(I, i0, i1, j0, j1, g, shape)
+        L = _zerocross(_log(gray(B), sig), thres)[core] > 0
+        B, core = _read(R, i0, i1, j0, j1, se.shape[0], shape)
+        B = B.astype(bool)
+        Re = dilation(B, se)[core].astype(bool)
+        E = np.logical_and(B, np.logical_not(binary_erosion(B)))[core]
+        return np.logical_or(np.logical_and(L, Re), E)
+
+    F = _alloc(shape, np.int32, tmpdir, 'F.dat')
+
+    # W = remove_small_objects(L, Amin), stored temporarily in F
+    lab = _label(edges, shape, tile, S, 2)
+    keep = lab['area'][lab['comp']] >= Amin
+    keep[0] = False
+    for i0, i1, j0, j1 in _tiles(shape, tile):
+        F[i0:i1, j0:j1] = keep[S[i0:i1, j0:j1]]
+
+    # regions of not(W) with Amin <= area <= N*M/6, numbered in raster order
+    lab = _label(lambda i0, i1, j0, j1: F[i0:i1, j0:j1] == 0, shape, tile, S, 1)
+    area = lab['area']
+    ok = np.logical_and(area >= Amin, area <= N * M / 6.0)
+    ok[lab['comp'][0]] = False
+    final = np.zeros(area.size, np.int32)
+    k = np.where(ok)[0]
+    final[k[np.argsort(lab['first'][k])]] = np.arange(1, k.size + 1)
+    final = final[lab['comp']]
+    for i0, i1, j0, j1 in _tiles(shape, tile):
+        F[i0:i1, j0:j1] = final[S[i0:i1, j0:j1]]
+
+    m = int(k.size)
+    print('{0} segmented regions.\n'.format(m))
+    return F, m
@@ -8,5 +8,14 @@ from .Bim_inthist import Bim_inthist
 from .Bim_inthistread import Bim_inthistread
 from .Bim_d1 import Bim_d1
 from .Bim_d2 import Bim_d2
+from .Bim_segtiled import Bim_segtiled
+from .Bim_hist import Bim_hist
+from .Bim_otsu import Bim_otsu
+from .Bim_conv2 import Bim_conv2
+from .Bim_ordfilt2 import Bim_ordfilt2
+from .Bim_pyramid import Bim_pyramid, Bim_pyramidlevel, Bim_pyramidresize
+from .Bim_regionindex import Bim_regionindex, Bim_regionwindow
 
-__all__ = ['Bim_segbalu', 'Bim_segmowgli', 'Bim_rgb2hcm', 'Bim_morphoreg', 'Bim_segotsu', 'Bim_maxmin', 'Bim_inthist', 'Bim_inthistread','Bim_d1','Bim_d2']
\ No newline at end of file
+__all__ = ['Bim_segbalu', 'Bim_segmowgli', 'Bim_rgb2hcm', 'Bim_morphoreg', 'Bim_segotsu', 'Bim_maxmin', 'Bim_inthist', 'Bim_inthistread','Bim_d1','Bim_d2',
+           'Bim_segtiled', 'Bim_hist', 'Bim_otsu', 'Bim_conv2', 'Bim_ordfilt2',
+           'Bim_regionindex', 'Bim_regionwindow', 'Bim_pyramid', 'Bim_pyramidlevel', 'Bim_pyramidresize']
\ No newline at end of file
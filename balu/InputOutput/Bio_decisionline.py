@@ -31,7 +31,7 @@ def Bio_decisionline(X, d, Xn, op):
                 {'name': 'knn', 'options': {'k': 5  }},         # KNN with 5 neighbors
                 {'name': 'lda', 'options': {'p': [] }},         # LDA
                 {'name': 'qda', 'options': {'p': [] }},         # QDA
-                {'name': 'svm', 'options': {'kernel': 3}},      # rbf-SVM
+                {'name': 'svm', 'options': {'kernel': 2}},      # rbf-SVM
             ]
             op = b
             struct = Bcl_structure(X, d, op)
@@ -11,6 +11,8 @@ def Bio_edgeview(B, E, cc=None, g=1, show_now=True):
      Toolbox: Balu
        Display gray or color image I overimposed by color pixels determined
        by binary image E. Useful to display the edges of an image.
+       E can also be a region index (see Bim_regionindex), then the pixels of
+       all its regions are displayed.
        Variable c is the color vector [r g b] indicating the color to be displayed
       (default: c = [1 0 0], i.e., red)
        Variable g is the number of pixels of the edge lines, default g = 1
@@ -60,6 +62,11 @@ def Bio_edgeview(B, E, cc=None, g=1, show_now=True):
         B2[ii, jj] = 1 / 256.0
         B3[ii, jj] = 1 / 256.0
 
+    if isinstance(E, dict):
+        F = np.zeros(E['shape'], bool)
+        F.flat[E['idx']] = True
+        E = F
+
     filterwarnings('ignore')
     E = dilation(E, square(g))
     ii, jj = np.where(E == 1)
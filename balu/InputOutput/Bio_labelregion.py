@@ -3,18 +3,21 @@ import numpy as np
 from skimage.color import rgb2gray
 from warnings import filterwarnings
 from balu.InputOutput import Bio_edgeview
+from balu.ImageProcessing import Bim_regionindex
 from matplotlib.widgets import RadioButtons
 from matplotlib.pyplot import close, imshow, axis, draw, colorbar, gca, plot, show, title, subplot, figure
 
 
 def Bio_labelregion(I, L, c):
     """ d, D = Bio_labelregion(I, L, c)
+     d, D = Bio_labelregion(I, Ri, c)
 
      Toolbox: Balu
         User interface to label regions of an image.
 
         I is the original image (color or grayvalue).
-        L is a labeled image that indicates the segmented regions of I.
+        L is a labeled image that indicates the segmented regions of I, or
+        its region index Ri (see Bim_regionindex).
         c is the maximal number of classes.
         d(i) will be the class number of region i.
         D is a binary image with the corresponding labels.
@@ -47,13 +50,17 @@ def Bio_labelregion(I, L, c):
 
     figure(1)
 
-    n = L.max()
+    if isinstance(L, dict):
+        Ri = L
+    else:
+        Ri = Bim_regionindex(L)
+    n = Ri['n']
     d = np.zeros((n, 1))
     i = 1
     D = np.zeros(J.shape)
     labels = tuple(['Correct label'] + ['class {0}'.format(a + 1) for a in range(c)])
 
-    data = {'n': n, 'd': d, 'i': i, 'c': c, 'D': D, 'J': J, 'L': L, 'labels': labels}
+    data = {'n': n, 'd': d, 'i': i, 'c': c, 'D': D, 'J': J, 'Ri': Ri, 'labels': labels}
 
     # Create the radio buttons subplot
     colorstr = '0bgrcmykwbgrcmykwbgrcmykw'
@@ -98,11 +105,11 @@ def mark_object(label, data):
     c = data['c']
     D = data['D']
     J = data['J']
-    L = data['L']
+    Ri = data['Ri']
     labels = data['labels']
 
     if i <= n:
-        ii, jj = np.where(L == i)
+        ii, jj = np.unravel_index(Ri['idx'][Ri['ptr'][i - 1]:Ri['ptr'][i]], Ri['shape'])
 
         if label == labels[0]:
             i = max(i - 2, 0)
@@ -110,10 +117,7 @@ def mark_object(label, data):
             r = labels.index(label)
             d[i - 1] = r
             D[ii, jj] = r
-            x1 = jj.max() + 1
-            x2 = jj.min() - 1
-            y1 = ii.max() + 1
-            y2 = ii.min() - 1
+            y2, x2, y1, x1 = Ri['bbox'][i - 1] + np.array([-1, -1, 1, 1])
             subplot(1, 3, 3)
             plot(np.array([x1, x1, x2, x2, x1]), np.array([y1, y2, y2, y1, y1]), color=colorstr[r - 1])
             axis([0, J.shape[1], 0, J.shape[0]])
@@ -132,8 +136,8 @@ def mark_object(label, data):
 
     subplot(1, 3, 2)
     R = np.zeros(J.shape)
-    kk, pp = np.where(L == i)
-    R[kk, pp] = 1
+    if i <= n:
+        R.flat[Ri['idx'][Ri['ptr'][i - 1]:Ri['ptr'][i]]] = 1
     title('Class label of\nyellow region?')
     Bio_edgeview(J, R, np.array([1, 1, 0]), show_now=False)
     draw()
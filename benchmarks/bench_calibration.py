@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+""" Check of the calibrated scores (options['output'] = 3, see Bcl_outscore
+ and Bft_sigmoid) of Bcl_dmin, Bcl_maha, Bcl_lda and Bcl_qda.
+
+ Gaussian data (4 classes, 5 features, 20,000 design and 200,000 test
+ samples): the test samples are sorted by score in 10 bins of the same size
+ and, for each bin, the accuracy is compared with the mean of the sigmoid
+ (the probability of a correct decision fitted in training). The accuracy
+ must increase with the score (monotone, up to 0.01 of noise).
+
+ Usage:
+    python benchmarks/bench_calibration.py
+"""
+import numpy as np
+from balu.Classification import Bcl_dmin, Bcl_maha, Bcl_lda, Bcl_qda
+
+classifiers = [
+    ('dmin', Bcl_dmin, {}),
+    ('maha', Bcl_maha, {}),
+    ('lda',  Bcl_lda,  {'p': []}),
+    ('qda',  Bcl_qda,  {'p': []}),
+]
+
+
+def gaussian(rs, N, K=4, m=5):
+    d = rs.randint(1, K + 1, N)
+    X = 1.5 * rs.randn(N, m) + d[:, np.newaxis] * np.linspace(0.5, 1, m)
+    return X, d
+
+
+def bench_calibration(bins=10):
+    rs = np.random.RandomState(1)
+    X, d = gaussian(rs, 20000)
+    Xt, dt = gaussian(rs, 200000)
+    N = dt.size
+    for cl, f, op in classifiers:
+        out, op = f(X, d, Xt, dict(op, output=3))
+        ds, sc = out[0:N], out[N:]
+        y = sc / 2 + 0.5                    # sigmoid of the gap
+        ok = ds == dt
+        q = np.argsort(sc, kind='mergesort')
+        acc = np.array([np.mean(ok[i]) for i in np.array_split(q, bins)])
+        prob = np.array([np.mean(y[i]) for i in np.array_split(q, bins)])
+        print('{0:6s} param = [{1:.3f}, {2:.3f}], accuracy {3:.4f}, monotone: {4}'.format(
+            cl, op['param'][0], op['param'][1], np.mean(ok), bool(np.all(np.diff(acc) >= -0.01))))
+        print('       accuracy per bin : ' + ' '.join(['{0:.3f}'.format(a) for a in acc]))
+        print('       sigmoid per bin  : ' + ' '.join(['{0:.3f}'.format(p) for p in prob]))
+
+
+if __name__ == '__main__':
+    bench_calibration()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of the float32 mode (options['dtype'] / Bcl_dtype) of Bcl_dmin,
+ Bcl_maha, Bcl_lda and Bcl_qda against float64.
+
+ 1) Bundled datasets (datagauss, datareal): accuracy in float64 and float32
+    and the fraction of test samples with the same decision.
+ 2) Gaussian data (1,000,000 test samples): test time and peak memory
+    allocated by the test (tracemalloc) with the test data in float64 and in
+    float32, and the agreement of the float32 decisions with float64. The
+    data is centered (offset 0) and uncentered (offset 1000, e.g. raw
+    intensities), where the rounding errors of float32 are larger.
+
+ Usage:
+    python benchmarks/bench_float32.py
+"""
+import time
+import tracemalloc
+import numpy as np
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_dmin, Bcl_maha, Bcl_lda, Bcl_qda
+from balu.FeatureTransformation import Bft_norm, Bft_pca
+from balu.PerformanceEvaluation import Bev_performance
+
+classifiers = [
+    ('dmin', Bcl_dmin, {}),
+    ('maha', Bcl_maha, {}),
+    ('lda',  Bcl_lda,  {'p': []}),
+    ('qda',  Bcl_qda,  {'p': []}),
+]
+
+
+def datasets():
+    data = balu_load('datagauss')
+    yield 'datagauss', data['X'], data['d'], data['Xt'], data['dt']
+
+    data = balu_load('datareal')
+    f = data['f']
+    X, _, _ = Bft_norm(f[:, np.std(f, axis=0) > 0], 1)
+    X = Bft_pca(X, 10)[0]                   # 10 principal components (maha and qda need N > m)
+    d = data['d']
+    j = np.random.RandomState(0).permutation(X.shape[0])
+    a, b = j[0:140], j[140:]
+    yield 'datareal', X[a], d[a], X[b], d[b]
+
+
+def bench_accuracy():
+    print('{0:10s} {1:6s} {2:>10s} {3:>10s} {4:>10s} {5:>10s}'.format(
+        'data', 'cl', 'acc f64', 'acc f32', 'delta', 'agreement'))
+    for name, X, d, Xt, dt in datasets():
+        for cl, f, op in classifiers:
+            ds64, _ = f(X, d, Xt, dict(op, dtype='float64'))
+            ds32, _ = f(X.astype(np.float32), d, Xt.astype(np.float32), dict(op, dtype='float32'))
+            p64 = Bev_performance(ds64, dt)
+            p32 = Bev_performance(ds32, dt)
+            print('{0:10s} {1:6s} {2:10.4f} {3:10.4f} {4:10.4f} {5:10.4f}'.format(
+                name, cl, p64, p32, p32 - p64, np.mean(np.ravel(ds64) == np.ravel(ds32))))
+
+
+def measure(f, Xt, op):
+    tracemalloc.start()
+    t0 = time.time()
+    ds, _ = f(Xt, op)
+    t = time.time() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ds, t, peak / 2.0 ** 20
+
+
+def bench_large(N=1000000, m=20, K=3, offset=0):
+    print('')
+    print('Gaussian data: {0} test samples, {1} features, {2} classes, offset {3}'.format(N, m, K, offset))
+    print('{0:6s} {1:>10s} {2:>10s} {3:>12s} {4:>12s} {5:>10s}'.format(
+        'cl', 'f64 [s]', 'f32 [s]', 'f64 [MB]', 'f32 [MB]', 'agreement'))
+    rs = np.random.RandomState(0)
+    X = rs.randn(30000, m) + np.repeat(np.arange(K), 10000)[:, np.newaxis] + offset
+    d = np.repeat(np.arange(K) + 1, 10000)[:, np.newaxis]
+    Xt = rs.randn(N, m) + offset
+    Xt32 = Xt.astype(np.float32)
+    for cl, f, op in classifiers:
+        op64 = f(X, d, dict(op, dtype='float64'))
+        op32 = f(X, d, dict(op, dtype='float32'))
+        ds64, t64, m64 = measure(f, Xt, op64)
+        ds32, t32, m32 = measure(f, Xt32, op32)
+        print('{0:6s} {1:10.3f} {2:10.3f} {3:12.1f} {4:12.1f} {5:10.4f}'.format(
+            cl, t64, t32, m64, m32, np.mean(np.ravel(ds64) == np.ravel(ds32))))
+    print('test data: {0:.1f} MB in float64, {1:.1f} MB in float32'.format(Xt.nbytes / 2.0 ** 20, Xt32.nbytes / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    bench_accuracy()
+    bench_large()
+    bench_large(offset=1000)
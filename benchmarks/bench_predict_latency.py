@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of the prediction latency of trained Balu classifiers on small
+ batches (1, 10 and 1000 rows).
+
+ The trained models are not copied in testing. The column 'deepcopy' is the
+ latency of the same call preceded by copy.deepcopy of the trained options
+ (the cost that every call of Bcl_structure had before).
+
+ Usage:
+    python benchmarks/bench_predict_latency.py
+"""
+import copy
+import time
+import numpy as np
+from balu.Classification import Bcl_structure
+from balu.DataSelectionAndGeneration import Bds_gaussgen
+
+classifiers = [
+    {'name': 'dmin', 'options': {}},
+    {'name': 'maha', 'options': {}},
+    {'name': 'lda',  'options': {'p': []}},
+    {'name': 'qda',  'options': {'p': []}},
+    {'name': 'knn',  'options': {'k': 5}},
+    {'name': 'svm',  'options': {'kernel': 'rbf'}},
+]
+
+
+def latency(f, nrep):
+    # median time of f() in milliseconds
+    t = []
+    for i in range(nrep):
+        t0 = time.time()
+        f()
+        t.append(time.time() - t0)
+    return 1000 * np.median(t)
+
+
+def bench(sizes=(1, 10, 1000), N=5000, m=10):
+    np.random.seed(0)
+    mu = np.vstack((np.zeros(m), np.ones(m)))
+    st = np.ones((2, m))
+    X, d = Bds_gaussgen(mu, st, N * np.ones((2, 1)))
+    Xt, _ = Bds_gaussgen(mu, st, 1000 * np.ones((2, 1)))
+
+    print('Training data: {0} samples, {1} features. Median latency [ms]'.format(X.shape[0], m))
+    print('{0:12s}'.format('classifier') + ''.join(['{0:>12s}{1:>12s}'.format('n={0}'.format(n), 'deepcopy') for n in sizes]))
+    models = [(b['name'], Bcl_structure(X, d, [b])) for b in classifiers]
+    models.append(('structure', Bcl_structure(X, d, classifiers)))
+    for name, op in models:
+        s = '{0:12s}'.format(name)
+        for n in sizes:
+            x = Xt[0:n]
+            nrep = 200 if n < 1000 else 20
+            t = latency(lambda: Bcl_structure(x, op), nrep)
+            t0 = latency(lambda: Bcl_structure(x, copy.deepcopy(op)), nrep)
+            s += '{0:12.3f}{1:12.3f}'.format(t, t0)
+        print(s)
+
+
+if __name__ == '__main__':
+    bench()
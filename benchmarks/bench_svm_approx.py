@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of the approximated rbf-SVM of Bcl_svm (options['approx'])
+ against the exact rbf-SVM (SVC of scikit-learn).
+
+ 1) datareal: accuracy and time on 10 random 70/30 hold-out splits.
+ 2) Gaussian data of increasing size (Bds_gaussgen): training time.
+
+ Usage:
+    python benchmarks/bench_svm_approx.py
+"""
+import time
+import numpy as np
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_svm
+from balu.FeatureTransformation import Bft_norm
+from balu.DataSelectionAndGeneration import Bds_gaussgen
+from balu.PerformanceEvaluation import Bev_performance
+
+methods = [
+    ('exact',           {'kernel': 'rbf'}),
+    ('rff, 200',        {'kernel': 'rbf', 'approx': 'rff', 'n_components': 200}),
+    ('rff, 1000',       {'kernel': 'rbf', 'approx': 'rff', 'n_components': 1000}),
+    ('nystroem, 100',   {'kernel': 'rbf', 'approx': 'nystroem', 'n_components': 100}),
+    ('nystroem, 500',   {'kernel': 'rbf', 'approx': 'nystroem', 'n_components': 500}),
+]
+
+
+def run(X, d, Xt, dt, op):
+    t0 = time.time()
+    op = Bcl_svm(X, d, op)
+    t1 = time.time()
+    ds, _ = Bcl_svm(Xt, op)
+    t2 = time.time()
+    return Bev_performance(ds, dt), t1 - t0, t2 - t1
+
+
+def bench_datareal(nrep=10):
+    data = balu_load('datareal')
+    f = data['f']
+    X, _, _ = Bft_norm(f[:, np.std(f, axis=0) > 0], 1)     # without constant features
+    d = data['d'].ravel()
+    N = X.shape[0]
+    print('datareal: {0} samples, {1} features, {2} hold-out splits'.format(N, X.shape[1], nrep))
+    print('{0:16s} {1:>10s} {2:>10s} {3:>10s}'.format('method', 'accuracy', 'train [s]', 'test [s]'))
+    for name, op in methods:
+        r = []
+        for i in range(nrep):
+            j = np.random.RandomState(i).permutation(N)
+            a, b = j[0:int(0.7 * N)], j[int(0.7 * N):]
+            r.append(run(X[a], d[a], X[b], d[b], op))
+        r = np.mean(r, axis=0)
+        print('{0:16s} {1:10.4f} {2:10.4f} {3:10.4f}'.format(name, r[0], r[1], r[2]))
+
+
+def bench_size(sizes=(2000, 10000, 40000)):
+    print('')
+    print('Gaussian data, 2 classes, 10 features: training time [s] (accuracy)')
+    print('{0:16s}'.format('method') + ''.join(['{0:>20d}'.format(n) for n in sizes]))
+    np.random.seed(0)
+    mu = np.vstack((np.zeros(10), np.ones(10) * 0.6))
+    st = np.ones((2, 10))
+    data = {}
+    for n in sizes:
+        X, d = Bds_gaussgen(mu, st, n * np.ones((2, 1)))
+        Xt, dt = Bds_gaussgen(mu, st, 2000 * np.ones((2, 1)))
+        data[n] = (X, d.ravel(), Xt, dt.ravel())
+    for name, op in methods:
+        s = '{0:16s}'.format(name)
+        for n in sizes:
+            if name == 'exact' and n > 10000:
+                s += '{0:>20s}'.format('skipped')
+                continue
+            p, t, _ = run(data[n][0], data[n][1], data[n][2], data[n][3], op)
+            s += '{0:>20s}'.format('{0:.2f} ({1:.3f})'.format(t, p))
+        print(s)
+
+
+if __name__ == '__main__':
+    bench_datareal()
+    bench_size()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+import numpy as np
+import pytest
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_batch, Bcl_structure, Bcl_lda, Bcl_knn, Bcl_dmin
+
+
+def _model():
+    data = balu_load('datagauss')
+    rs = np.random.RandomState(0)
+    Xt = np.vstack([data['Xt']] * 5) + 0.01 * rs.randn(1000, 2)
+    return data['X'], data['d'], Xt
+
+
+@pytest.mark.parametrize('name, f, options', [
+    ('lda', Bcl_lda, {'p': []}),
+    ('knn', Bcl_knn, {'k': 5}),
+    ('dmin', Bcl_dmin, {'output': 2}),
+])
+@pytest.mark.parametrize('chunk, n_jobs', [(1000, 1), (97, 1), (97, 3)])
+def test_batch_equals_direct(name, f, options, chunk, n_jobs):
+    X, d, Xt = _model()
+    op = f(X, d, dict(options))
+    ds0 = np.asarray(f(Xt, op)[0])
+    if ds0.ndim == 1 and ds0.size == 2 * Xt.shape[0]:
+        ds0 = ds0.reshape(2, -1).T
+    ds = Bcl_batch(Xt, {'name': name, 'options': op}, chunk, n_jobs)
+    np.testing.assert_array_equal(ds.reshape(ds0.shape), ds0)
+
+
+def test_batch_structure_memmap_and_iterator(tmp_path):
+    X, d, Xt = _model()
+    b = Bcl_structure(X, d, [{'name': 'knn', 'options': {'k': 5}}, {'name': 'lda', 'options': {'p': []}}])
+    ds0, _ = Bcl_structure(Xt, b)
+    path = os.path.join(str(tmp_path), 'Xt.npy')
+    np.save(path, Xt)
+    Xm = np.load(path, mmap_mode='r')
+    out = os.path.join(str(tmp_path), 'ds.npy')
+    ds = Bcl_batch(Xm, {'name': 'structure', 'options': b}, 128, 2, out)
+    np.testing.assert_array_equal(ds, ds0)
+    np.testing.assert_array_equal(np.load(out), ds0)
+    ds = Bcl_batch((Xt[q:q + 300] for q in range(0, Xt.shape[0], 300)), {'name': 'structure', 'options': b})
+    np.testing.assert_array_equal(ds, ds0)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_cascade
+
+
+def _data():
+    data = balu_load('datagauss')
+    return data['X'], data['d'], data['Xt'], data['dt']
+
+
+def test_cascade_pass_rates_of_the_test():
+    X, d, Xt, dt = _data()
+    s = [{'name': 'dmin', 'options': {}, 'features': [0]}, {'name': 'lda', 'options': {'p': []}}]
+    op = Bcl_cascade(X, d, {'stages': s})
+    design = list(op['pass'])
+    ds, opt = Bcl_cascade(Xt, op)
+    assert not op['truncated']
+    assert opt is not op and list(op['pass']) == design          # the trained options are not modified
+    assert opt['pass'][0] == 1 and 0 < opt['pass'][1] < 1
+    assert np.mean(ds.ravel() == dt.ravel()) > 0.85
+
+
+def test_cascade_truncated_when_one_class_reaches_a_stage():
+    X, d, Xt, dt = _data()
+    X = X.copy()
+    X[d.ravel() == 2] += 20                                      # separable: the first stage decides all
+    s = [{'name': 'dmin', 'options': {}}, {'name': 'lda', 'options': {'p': []}},
+         {'name': 'qda', 'options': {'p': []}}]
+    op = Bcl_cascade(X, d, {'stages': s, 'fnr': 0.0, 'fpr': 0.0})
+    assert op['truncated'] and len(op['stages']) == 1
+    ds, opt = Bcl_cascade(Xt, op)
+    assert ds.shape[0] == Xt.shape[0] and list(opt['pass']) == [1]
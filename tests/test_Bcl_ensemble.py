@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import sys
+import numpy as np
+import pytest
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_ensemble
+
+members = [
+    {'name': 'dmin', 'options': {}},
+    {'name': 'lda', 'options': {'p': []}},
+    {'name': 'knn', 'options': {'k': 5}},
+]
+
+
+def test_early_exit_is_exact():
+    data = balu_load('datagauss')
+    ds0, _ = Bcl_ensemble(data['X'], data['d'], data['Xt'], {'members': members})
+    ds1, _ = Bcl_ensemble(data['X'], data['d'], data['Xt'], {'members': members, 'early_exit': True})
+    np.testing.assert_array_equal(ds0, ds1)
+
+
+def test_unknown_label_is_rejected():
+    _code = sys.modules['balu.Classification.Bcl_ensemble']._code
+    np.testing.assert_array_equal(_code(np.array([2.0, 1.0]), np.array([1, 2]))[:, 0], [1, 0])
+    with pytest.raises(SystemExit):
+        _code(np.array([1, 3]), np.array([1, 2]))
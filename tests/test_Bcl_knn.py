@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_knn, Bcl_knnindex, Bcl_knnquery
+
+
+def _data():
+    rs = np.random.RandomState(0)
+    X = rs.randn(3000, 6)
+    d = (X[:, 0] + X[:, 1] + 0.5 * rs.randn(3000) > 0) + 1
+    Xt = rs.randn(500, 6)
+    return X, d[:, np.newaxis], Xt
+
+
+@pytest.mark.parametrize('index', [
+    {'index': 'kdtree'},
+    {'index': 'balltree'},
+    {'index': 'brute'},
+    {'index': 'brute', 'chunk': 64, 'xchunk': 100},
+    {'index': 'ivf', 'nlist': 20, 'nprobe': 20},        # all the lists: exact
+    {'index': 'ivf', 'nlist': 20, 'nprobe': 20, 'chunk': 64, 'xchunk': 7, 'n_jobs': 2},
+])
+def test_backends_list_of_k(index):
+    X, d, Xt = _data()
+    ds0, _ = Bcl_knn(X, d, Xt, {'k': [1, 5, 9]})
+    ds, _ = Bcl_knn(X, d, Xt, dict(index, k=[1, 5, 9]))
+    np.testing.assert_array_equal(ds, ds0)
+    for j, k in enumerate([1, 5, 9]):
+        dsk, _ = Bcl_knn(X, d, Xt, dict(index, k=k))
+        np.testing.assert_array_equal(np.ravel(dsk), ds[:, j])
+
+
+@pytest.mark.parametrize('t', ['kdtree', 'balltree', 'brute'])
+def test_query_exact(t):
+    X, _, Xt = _data()
+    e = np.sum((Xt[:, np.newaxis, :] - X[np.newaxis]) ** 2, axis=2)
+    i0 = np.argsort(e, axis=1, kind='mergesort')[:, 0:7]
+    dist, i = Bcl_knnquery(Bcl_knnindex(X, {'index': t, 'xchunk': 1000}), Xt, 7)
+    np.testing.assert_array_equal(i, i0)
+    np.testing.assert_allclose(dist, np.sqrt(np.take_along_axis(e, i0, axis=1)))
+
+
+def test_datagauss():
+    data = balu_load('datagauss')
+    ds0, _ = Bcl_knn(data['X'], data['d'], data['Xt'], {'k': 5})
+    for t in ['balltree', 'brute', 'ivf']:
+        ds, _ = Bcl_knn(data['X'], data['d'], data['Xt'], {'k': 5, 'index': t, 'nprobe': 1000})
+        np.testing.assert_array_equal(ds, ds0)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from balu.Classification import Bcl_knnreduce, Bcl_knn
+
+
+def _data(N=3000):
+    rs = np.random.RandomState(0)
+    d = rs.randint(1, 4, N)
+    X = rs.randn(N, 4) + d[:, np.newaxis]
+    return X, d
+
+
+def _nearest(Xs, X):
+    e = np.sum(X ** 2, axis=1)[:, np.newaxis] - 2 * np.dot(X, Xs.T) + np.sum(Xs ** 2, axis=1)
+    return np.argmin(e, axis=1)
+
+
+@pytest.mark.parametrize('block', [1, 7, 256, 5000])
+def test_cnn_is_consistent(block):
+    # every design sample is classified correctly by its nearest prototype
+    X, d = _data()
+    Xr, dr, info = Bcl_knnreduce(X, d, {'reduce': 'cnn', 'block': block, 'nacc': 0})
+    assert info['Nr'] == Xr.shape[0] < X.shape[0]
+    assert 'acc' not in info and 'nacc' not in info
+    np.testing.assert_array_equal(dr.ravel()[_nearest(Xr, X)], d)
+
+
+def test_accuracy_on_a_subsample():
+    X, d = _data()
+    _, _, info = Bcl_knnreduce(X, d, {'reduce': 'enn', 'k': 5, 'nacc': 500})
+    assert info['nacc'] == 500
+    assert 0 < info['acc0'] <= 1 and 0 < info['acc'] <= 1
+    assert info['change'] == info['acc'] - info['acc0']
+
+
+def test_kmeans_prototypes_in_knn():
+    X, d = _data()
+    op = Bcl_knn(X, d, {'k': 1, 'reduce': 'kmeans', 'nproto': 20, 'nacc': 0})
+    assert op['reduction']['Nr'] == 60
+    ds, _ = Bcl_knn(X, op)
+    assert np.mean(ds.ravel() == d) > 0.6
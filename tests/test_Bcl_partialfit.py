@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_partialfit, Bcl_finalize, Bcl_dmin, Bcl_maha, Bcl_lda, Bcl_qda
+
+
+@pytest.mark.parametrize('name, f, options', [
+    ('dmin', Bcl_dmin, {}),
+    ('maha', Bcl_maha, {}),
+    ('lda', Bcl_lda, {'p': []}),
+    ('qda', Bcl_qda, {'p': []}),
+])
+def test_finalize_equals_batch(name, f, options):
+    data = balu_load('datagauss')
+    X, d, Xt = data['X'], data['d'], data['Xt']
+    stats = None
+    for q in range(0, X.shape[0], 37):                  # mini-batches with missing classes
+        stats = Bcl_partialfit(X[q:q + 37], d[q:q + 37], stats)
+    op = Bcl_finalize(stats, name, dict(options))
+    op0 = f(X, d, dict(options))
+
+    np.testing.assert_allclose(op['mc'], op0['mc'], rtol=1e-10, atol=1e-12)
+    np.testing.assert_array_equal(f(Xt, op)[0], f(Xt, op0)[0])
+    s = f(Xt, dict(op, output=1))[0]
+    s0 = f(Xt, dict(op0, output=1))[0]
+    np.testing.assert_allclose(s, s0, rtol=1e-8)
+
+
+def test_finalize_reports_single_sample_class():
+    data = balu_load('datagauss')
+    X = np.vstack((data['X'], [[9.0, 9.0]]))
+    d = np.vstack((data['d'], [[3]]))
+    stats = Bcl_partialfit(X, d)
+    with pytest.raises(SystemExit):
+        Bcl_finalize(stats, 'qda', {'p': []})
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import pickle
+import numpy as np
+import pytest
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_knn, Bcl_lda, Bcl_svm, Bcl_nn, Bcl_structure, Bcl_save, Bcl_load
+
+
+def _manifest(path, model, files=()):
+    with open(os.path.join(str(path), 'manifest.json'), 'w') as f:
+        json.dump({'format': 'balu-model', 'version': 1, 'files': list(files), 'model': model}, f)
+    return str(path)
+
+
+class _Evil(object):
+    def __reduce__(self):
+        return (os.system, ('echo pwned',))
+
+
+@pytest.mark.parametrize('f, options', [
+    (Bcl_knn, {'k': 5}),
+    (Bcl_knn, {'k': 5, 'index': 'balltree'}),
+    (Bcl_knn, {'k': 5, 'index': 'ivf'}),
+    (Bcl_lda, {'p': []}),
+    (Bcl_svm, {'kernel': 2}),
+    (Bcl_svm, {'kernel': 0, 'solver': 'sgd'}),
+    (Bcl_nn, {'method': 1, 'iter': 20, 'solver': 'adam'}),
+])
+def test_save_load(tmp_path, f, options):
+    data = balu_load('datagauss')
+    op = f(data['X'], data['d'], options)
+    Bcl_save(str(tmp_path), op)
+    op2 = Bcl_load(str(tmp_path))
+    np.testing.assert_array_equal(f(data['Xt'], op)[0], f(data['Xt'], op2)[0])
+
+
+def test_save_load_structure(tmp_path):
+    data = balu_load('datagauss')
+    b = [{'name': 'knn', 'options': {'k': 5}}, {'name': 'lda', 'options': {'p': []}}]
+    op = Bcl_structure(data['X'], data['d'], b)
+    Bcl_save(str(tmp_path), op)
+    op2 = Bcl_load(str(tmp_path), mmap=False)
+    np.testing.assert_array_equal(Bcl_structure(data['Xt'], op)[0], Bcl_structure(data['Xt'], op2)[0])
+
+
+@pytest.mark.parametrize('model', [
+    {'__global__': ['os', 'system']},
+    {'__object__': ['os', 'system'], 'args': {'__tuple__': ['echo pwned']}},
+    {'__object__': ['builtins', 'eval'], 'args': {'__tuple__': ['1']}},
+    {'__object__': ['numpy.testing._private.utils', 'runstring'],
+     'args': {'__tuple__': ["open('pwned', 'w').write('x')", {'__dict__': {}}]}},
+    {'__object__': ['numpy', 'save'], 'args': {'__tuple__': ['pwned', 1]}},
+    {'__object__': ['sklearn.utils._testing', '_convert_container'], 'args': {'__tuple__': [[1], 'list']}},
+    {'__global__': ['balu.Classification.Bcl_save', 'Bcl_save']},
+])
+def test_load_rejects_globals(tmp_path, model):
+    path = _manifest(tmp_path, model)
+    with pytest.raises(SystemExit):
+        Bcl_load(path)
+    assert not os.path.exists('pwned')
+
+
+def test_load_rejects_pickle(tmp_path):
+    with open(os.path.join(str(tmp_path), 'o0.pkl'), 'wb') as f:
+        pickle.dump(_Evil(), f, protocol=2)
+    path = _manifest(tmp_path, {'__pickle__': 'o0.pkl'}, ['o0.pkl'])
+    with pytest.raises(SystemExit):
+        Bcl_load(path)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import numpy as np
+from multiprocessing.pool import ThreadPool
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_structure, Bcl_server
+
+try:
+    from urllib.request import urlopen, Request
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import urlopen, Request, HTTPError
+
+
+def _post(url, body):
+    r = Request(url, json.dumps(body).encode('utf-8'), {'Content-Type': 'application/json'})
+    try:
+        return 200, json.loads(urlopen(r).read().decode('utf-8'))
+    except HTTPError as e:
+        return e.code, json.loads(e.read().decode('utf-8'))
+
+
+def test_server_equals_structure():
+    data = balu_load('datagauss')
+    b = Bcl_structure(data['X'], data['d'], [{'name': 'knn', 'options': {'k': 5}},
+                                             {'name': 'lda', 'options': {'p': []}}])
+    Xt = data['Xt']
+    ds0, _ = Bcl_structure(Xt, b)
+
+    server = Bcl_server(b, port=0, max_batch=64, max_latency=0.01, serve=False)
+    t = threading.Thread(target=server.serve_forever)
+    t.daemon = True
+    t.start()
+    url = 'http://127.0.0.1:{0}'.format(server.server_address[1])
+    try:
+        # concurrent requests of 1 to 9 rows, grouped in micro-batches
+        blocks = [(q, min(q + 1 + q % 9, Xt.shape[0])) for q in range(0, Xt.shape[0], 10)]
+        pool = ThreadPool(8)
+        res = pool.map(lambda r: _post(url + '/predict', {'X': Xt[r[0]:r[1]].tolist()}), blocks)
+        pool.close()
+        for (q0, q1), (code, out) in zip(blocks, res):
+            assert code == 200
+            np.testing.assert_array_equal(np.array(out['ds']), ds0[q0:q1])
+
+        code, out = _post(url + '/predict', {'X': Xt[0].tolist()})        # a single row
+        assert code == 200 and np.array(out['ds']).shape == (1, 2)
+        code, out = _post(url + '/predict', {'Y': []})
+        assert code == 400 and 'error' in out
+
+        s = json.loads(urlopen(url + '/stats').read().decode('utf-8'))
+        assert s['requests'] == len(blocks) + 1 and s['errors'] == 0
+        assert s['batches'] <= s['requests']
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from balu.ImagesAndData import balu_load
+from balu.Classification import Bcl_structure
+
+
+def _b():
+    return [
+        {'name': 'knn',  'options': {'k': 5}},
+        {'name': 'lda',  'options': {'p': []}},
+        {'name': 'qda',  'options': {'p': []}},
+        {'name': 'maha', 'options': {}},
+        {'name': 'dmin', 'options': {}},
+    ]
+
+
+@pytest.mark.parametrize('n_jobs, backend', [(3, 'thread'), (3, 'process'), (-1, 'process')])
+def test_parallel_equals_serial(n_jobs, backend):
+    data = balu_load('datagauss')
+    X, d, Xt = data['X'], data['d'], data['Xt']
+    ds0, _ = Bcl_structure(X, d, Xt, _b())
+    ds, b = Bcl_structure(X, d, Xt, _b(), n_jobs=n_jobs, backend=backend)
+    np.testing.assert_array_equal(ds, ds0)
+    assert ds.shape == (Xt.shape[0], 5)
+    ds, _ = Bcl_structure(Xt, b, n_jobs=n_jobs, backend=backend)   # testing only, pools reused
+    np.testing.assert_array_equal(ds, ds0)
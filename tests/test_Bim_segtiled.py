@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import os
+import numpy as np
+import pytest
+from balu.ImagesAndData import balu_imageload
+from balu.ImageProcessing import Bim_segtiled, Bim_segotsu, Bim_segbalu, Bim_segmowgli
+
+
+def _image(tmp_path, name):
+    X = balu_imageload(name)
+    path = os.path.join(str(tmp_path), 'I.npy')
+    np.save(path, X)
+    return X, np.load(path, mmap_mode='r')
+
+
+@pytest.mark.parametrize('tile', [97, 4096])
+def test_segtiled_otsu(tmp_path, tile):
+    X, I = _image(tmp_path, 'testimg1.jpg')
+    R0, E0, _ = Bim_segotsu(X)
+    R, E = Bim_segtiled(I, 'otsu', tile=tile)
+    np.testing.assert_array_equal(np.asarray(R) > 0, R0 > 0)
+    np.testing.assert_array_equal(np.asarray(E) > 0, E0 > 0)
+
+
+def test_segtiled_balu_on_disk(tmp_path):
+    X, I = _image(tmp_path, 'testimg1.jpg')
+    R0, E0, _ = Bim_segbalu(X)
+    R, E = Bim_segtiled(I, 'balu', tile=77, tmpdir=str(tmp_path))
+    assert isinstance(R, np.memmap)
+    np.testing.assert_array_equal(np.asarray(R) > 0, R0 > 0)
+    np.testing.assert_array_equal(np.asarray(E) > 0, E0 > 0)
+
+
+def test_segtiled_mowgli(tmp_path):
+    X, I = _image(tmp_path, 'rice.png')
+    F0, m0 = Bim_segmowgli(X)
+    F, m = Bim_segtiled(I, 'mowgli', tile=97)
+    F = np.asarray(F)
+    assert m == m0
+    # the same regions, up to the numbering
+    pairs = np.unique(np.column_stack((F.ravel(), F0.ravel())), axis=0)
+    assert pairs.shape[0] == m0 + 1